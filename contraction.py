@@ -0,0 +1,231 @@
+import heapq
+import math
+import numpy as np
+
+# Contraction hierarchy over a RoadGraph. Nodes are contracted one at a time (cheapest first); when
+# removing a node would lengthen the shortest path between two of its neighbours, a shortcut edge
+# remembering the removed middle node replaces it. A query then only relaxes edges leading to
+# later-contracted ("higher") nodes, searching up from both ends until the searches meet.
+
+WITNESS_SETTLE_LIMIT = 60  # Nodes a witness search may settle before a shortcut is added anyway
+
+
+class ContractionHierarchy:
+    """Preprocessed road graph for fast repeated route queries.
+    
+    rank gives each node's contraction order; up[v] lists (w, length, middle, edge) for neighbours w
+    ranked above v, where middle is the contracted node a shortcut skips (-1 for an original edge,
+    whose RoadGraph edge id is edge).
+    """
+    def __init__(self, graph, rank, up):
+        self.graph = graph
+        self.rank = rank
+        self.up = up
+        self.upward = [[(w, length) for w, length, _, _ in arcs] for arcs in up]
+        self.arcs = {}
+        for v, arcs in enumerate(up):
+            for w, length, middle, edge in arcs:
+                self.arcs[(min(v, w), max(v, w))] = (middle, edge)
+        self.settled = 0
+    
+    @classmethod
+    def build(cls, graph):
+        count = len(graph.nodes)
+        # Current overlay graph between uncontracted nodes: neighbour -> (length, middle, edge)
+        overlay = [{} for _ in range(count)]
+        for e, (a, b, length, _) in enumerate(graph.edges):
+            if a != b and length < overlay[a].get(b, (math.inf,))[0]:
+                overlay[a][b] = overlay[b][a] = (length, -1, e)
+        
+        def witness(source, excluded, limit):
+            # Bounded Dijkstra from source avoiding excluded; returns the distances found
+            dist = {source: 0.0}
+            frontier = [(0.0, source)]
+            settled = 0
+            while frontier and settled < WITNESS_SETTLE_LIMIT:
+                cost, node = heapq.heappop(frontier)
+                if cost > dist[node]:
+                    continue
+                if cost > limit:
+                    break
+                settled += 1
+                for neighbor, (length, _, _) in overlay[node].items():
+                    new_cost = cost + length
+                    if neighbor != excluded and new_cost < dist.get(neighbor, math.inf):
+                        dist[neighbor] = new_cost
+                        heapq.heappush(frontier, (new_cost, neighbor))
+            return dist
+        
+        def shortcuts(v):
+            # Shortcuts needed to remove v: (u, w, length) for neighbour pairs with no witness path
+            neighbors = list(overlay[v].items())
+            needed = []
+            for i, (u, (to_u, _, _)) in enumerate(neighbors[:-1]):
+                others = neighbors[i + 1:]
+                limit = to_u + max(to_w for _, (to_w, _, _) in others)
+                dist = witness(u, v, limit)
+                for w, (to_w, _, _) in others:
+                    if dist.get(w, math.inf) > to_u + to_w:
+                        needed.append((u, w, to_u + to_w))
+            return needed
+        
+        deleted_neighbors = [0] * count
+        
+        def priority(v):
+            # Edge difference plus contracted neighbours, which spreads contraction evenly
+            return len(shortcuts(v)) - len(overlay[v]) + deleted_neighbors[v]
+        
+        queue = [(priority(v), v) for v in range(count)]
+        heapq.heapify(queue)
+        rank = [0] * count
+        up = [[] for _ in range(count)]
+        order = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            # Lazy update: re-evaluate, and put v back if it is no longer the cheapest
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+            
+            for u, w, length in shortcuts(v):
+                if length < overlay[u].get(w, (math.inf,))[0]:
+                    overlay[u][w] = overlay[w][u] = (length, v, -1)
+            
+            rank[v] = order
+            order += 1
+            for w, (length, middle, edge) in overlay[v].items():
+                up[v].append((w, length, middle, edge))
+                del overlay[w][v]
+                deleted_neighbors[w] += 1
+            overlay[v] = {}
+        return cls(graph, rank, up)
+    
+    def save(self, path):
+        # Flat arrays in one .npz; load checks they still describe the same road graph
+        lengths = [len(arcs) for arcs in self.up]
+        arcs = [arc for arcs in self.up for arc in arcs]
+        np.savez_compressed(
+            path,
+            rank=np.array(self.rank, dtype=np.int32),
+            arc_counts=np.array(lengths, dtype=np.int32),
+            arc_target=np.array([arc[0] for arc in arcs], dtype=np.int32),
+            arc_length=np.array([arc[1] for arc in arcs], dtype=np.float64),
+            arc_middle=np.array([arc[2] for arc in arcs], dtype=np.int32),
+            arc_edge=np.array([arc[3] for arc in arcs], dtype=np.int32),
+            fingerprint=self.fingerprint(self.graph),
+        )
+    
+    @classmethod
+    def load(cls, path, graph):
+        """The hierarchy saved at path, or None if missing or built for a different graph"""
+        try:
+            with np.load(path) as data:
+                if not np.array_equal(data["fingerprint"], cls.fingerprint(graph)):
+                    return None
+                starts = np.concatenate(([0], np.cumsum(data["arc_counts"]))).tolist()
+                columns = zip(data["arc_target"].tolist(), data["arc_length"].tolist(),
+                              data["arc_middle"].tolist(), data["arc_edge"].tolist())
+                arcs = list(columns)
+                up = [arcs[starts[v]:starts[v + 1]] for v in range(len(starts) - 1)]
+                return cls(graph, data["rank"].tolist(), up)
+        except (OSError, KeyError, ValueError):
+            return None
+    
+    @staticmethod
+    def fingerprint(graph):
+        return np.array([len(graph.nodes), len(graph.edges), int(graph.node_pixels.sum()) % (2 ** 31),
+                         graph.width, graph.height], dtype=np.int64)
+    
+    def unpack(self, u, w, steps):
+        # Append the original-edge steps (previous, edge, next) making up the arc between u and w
+        stack = [(u, w)]
+        while stack:
+            u, w = stack.pop()
+            middle, edge = self.arcs[(min(u, w), max(u, w))]
+            if middle == -1:
+                steps.append((u, edge, w))
+            else:
+                stack.append((middle, w))
+                stack.append((u, middle))
+    
+    def upward_search(self, anchors, other=None, bound=math.inf):
+        """Dijkstra over upward arcs from anchors ({node: cost}); returns (dist, parent).
+        
+        Given the other side's finished distances, entries that can no longer beat the best meeting
+        cost found so far (starting from bound) end the search.
+        """
+        dist = dict(anchors)
+        parent = dict.fromkeys(anchors)
+        frontier = [(cost, node) for node, cost in anchors.items()]
+        heapq.heapify(frontier)
+        upward, inf = self.upward, math.inf
+        while frontier:
+            cost, node = heapq.heappop(frontier)
+            if cost > dist[node]:
+                continue
+            if other is not None:
+                if cost >= bound:
+                    break
+                meet = other.get(node)
+                if meet is not None and cost + meet < bound:
+                    bound = cost + meet
+            self.settled += 1
+            arcs = upward[node]
+            # Stall on demand: a higher neighbour already reached more cheaply means this distance is
+            # not a shortest one, so nothing found through it can be either
+            stalled = False
+            for neighbor, length in arcs:
+                if dist.get(neighbor, inf) + length < cost:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            for neighbor, length in arcs:
+                new_cost = cost + length
+                if new_cost < dist.get(neighbor, inf):
+                    dist[neighbor] = new_cost
+                    parent[neighbor] = node
+                    heapq.heappush(frontier, (new_cost, neighbor))
+        return dist, parent
+    
+    def find_route(self, start, goal):
+        """Same routes as RoadGraph.find_route, searching only upward in the hierarchy"""
+        graph = self.graph
+        self.settled = 0
+        source, target = graph.snap(start), graph.snap(goal)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [graph.location_xy(source)]
+        if graph.location_component(source) != graph.location_component(target):
+            return None
+        
+        direct = graph.direct_cost(source, target)
+        best_cost = direct if direct is not None else math.inf
+        meeting = None
+        
+        # Upward search from the source to exhaustion, then from the target, meeting the first one
+        forward, forward_parent = self.upward_search(graph.anchors(source))
+        backward, backward_parent = self.upward_search(graph.anchors(target), forward, best_cost)
+        for node, cost in backward.items():
+            other = forward.get(node)
+            if other is not None and cost + other < best_cost:
+                best_cost, meeting = cost + other, node
+        
+        if meeting is None:
+            return None if direct is None else graph.direct_route(source, target)
+        
+        # Hierarchy nodes from the source anchor to the meeting node and on to the target anchor
+        up_chain = [meeting]
+        while forward_parent[up_chain[-1]] is not None:
+            up_chain.append(forward_parent[up_chain[-1]])
+        down_chain = [meeting]
+        while backward_parent[down_chain[-1]] is not None:
+            down_chain.append(backward_parent[down_chain[-1]])
+        nodes = up_chain[::-1] + down_chain[1:]
+        
+        steps = []
+        for u, w in zip(nodes, nodes[1:]):
+            self.unpack(u, w, steps)
+        return graph.route_pixels(source, target, nodes[0], steps)
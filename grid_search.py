@@ -0,0 +1,527 @@
+import heapq
+import math
+import numpy as np
+
+# Grid pathfinding shared by the maze and map games. Grids are boolean "walkable" arrays indexed
+# [y, x]; positions are (x, y) tuples; moves are 4-connected with unit cost. The map searches also
+# take integer cost grids, where entering a cell costs its value and 0 is impassable, and
+# WeightedGridAStar adds diagonal and any-angle moves.
+
+# WeightedGridAStar step lengths: integers keep its heap entries packable, and 142 / 100 is just above
+# sqrt(2), so no move is cheaper than the straight line the any-angle heuristic measures
+STRAIGHT_COST = 100
+DIAGONAL_COST = 142
+
+
+class JumpPointSearch:
+    """Jump Point Search for 4-connected uniform-cost grids.
+    
+    Canonical paths go vertical first, then horizontal: a vertical move may continue or turn either
+    way, a horizontal move only continues unless a wall behind it forces a vertical turn. Straight
+    runs are scanned without touching the heap, and only their end points (jump points) are queued,
+    so open areas and long roads cost a handful of heap operations instead of one per cell. Returned
+    paths have the same length as plain A*'s.
+    """
+    def __init__(self, walkable):
+        height, width = walkable.shape
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        # One blocked cell of padding on every side removes all bounds checks from the scans
+        self.open = bytearray(np.pad(walkable.astype(bool), 1).astype(np.uint8).tobytes())
+        self.expansions = 0
+        self.heap_pushes = 0
+    
+    def index(self, x, y):
+        return (y + 1) * self.stride + x + 1
+    
+    def position(self, index):
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
+    
+    def jump_horizontal(self, index, dx, goal):
+        open_, stride = self.open, self.stride
+        while True:
+            index += dx
+            if not open_[index]:
+                return None
+            if index == goal:
+                return index
+            # Forced neighbour: a vertical opening whose cell behind us is blocked
+            if (open_[index - stride] and not open_[index - stride - dx]) or \
+               (open_[index + stride] and not open_[index + stride - dx]):
+                return index
+    
+    def jump_vertical(self, index, dy, goal):
+        open_ = self.open
+        while True:
+            index += dy
+            if not open_[index]:
+                return None
+            if index == goal:
+                return index
+            # Any horizontal run from here that reaches a jump point makes this cell one
+            if (open_[index + 1] and self.jump_horizontal(index, 1, goal) is not None) or \
+               (open_[index - 1] and self.jump_horizontal(index, -1, goal) is not None):
+                return index
+    
+    def successors(self, index, direction, goal):
+        open_, stride = self.open, self.stride
+        if direction is None:
+            moves = [(1, False), (-1, False), (stride, True), (-stride, True)]
+        elif direction in (stride, -stride):
+            moves = [(direction, True), (1, False), (-1, False)]
+        else:
+            moves = [(direction, False)]
+            for dy in (stride, -stride):
+                if open_[index + dy] and not open_[index + dy - direction]:
+                    moves.append((dy, True))
+        
+        for step, vertical in moves:
+            found = self.jump_vertical(index, step, goal) if vertical else self.jump_horizontal(index, step, goal)
+            if found is not None:
+                yield found, step
+    
+    def find_path(self, start, goal):
+        """Shortest 4-connected path as a list of (x, y), or None"""
+        self.expansions = 0
+        self.heap_pushes = 0
+        if start == goal:
+            return [start]
+        if not (0 <= goal[0] < self.width and 0 <= goal[1] < self.height):
+            return None
+        
+        start_index, goal_index = self.index(*start), self.index(*goal)
+        gx, gy = goal
+        stride = self.stride
+        
+        def heuristic(index):
+            y, x = divmod(index, stride)
+            return abs(x - 1 - gx) + abs(y - 1 - gy)
+        
+        frontier = [(heuristic(start_index), 0, start_index, None)]
+        self.heap_pushes += 1
+        cost_so_far = {start_index: 0}
+        came_from = {start_index: None}
+        
+        while frontier:
+            _, cost, current, direction = heapq.heappop(frontier)
+            if cost > cost_so_far[current]:
+                continue
+            if current == goal_index:
+                return self.reconstruct(came_from, goal_index)
+            self.expansions += 1
+            
+            for found, step in self.successors(current, direction, goal_index):
+                new_cost = cost + abs(found - current) // abs(step)
+                if new_cost < cost_so_far.get(found, new_cost + 1):
+                    cost_so_far[found] = new_cost
+                    came_from[found] = current
+                    heapq.heappush(frontier, (new_cost + heuristic(found), new_cost, found, step))
+                    self.heap_pushes += 1
+        return None
+    
+    def reconstruct(self, came_from, goal_index):
+        # Expand the straight segments between jump points back into single cells
+        points = []
+        current = goal_index
+        while current is not None:
+            points.append(current)
+            current = came_from[current]
+        points.reverse()
+        
+        path = [self.position(points[0])]
+        for a, b in zip(points, points[1:]):
+            step = 1 if abs(b - a) < self.stride else self.stride
+            step = step if b > a else -step
+            path.extend(self.position(i) for i in range(a + step, b + step, step))
+        return path
+
+
+class GridAStar:
+    """Plain A* over a 4-connected grid (walkable mask or uint8 cost grid) with all search state in
+    flat arrays.
+    
+    Per cell of the padded grid there is an int32 g-score and a uint8 parent code (which of the four
+    moves reached it, 0 for none), allocated once per grid and read through memoryviews: five bytes
+    per pixel, against a Node object and a set entry per push. Heap entries are single integers
+    packing (f, h, index), ties on f going to the entry closest to the goal. Entries made stale by a
+    later improvement are skipped when popped, which also makes a separate closed flag unnecessary:
+    with a consistent heuristic an expanded cell is never improved again.
+    """
+    def __init__(self, walkable):
+        height, width = walkable.shape
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        # Cost of entering each padded cell, 0 where blocked
+        self.open = bytearray(np.pad(np.asarray(walkable).astype(np.uint8), 1).tobytes())
+        cells = np.frombuffer(self.open, dtype=np.uint8)
+        self.min_cost = int(cells[cells > 0].min()) if cells.any() else 1
+        self.steps = (-1, 1, -self.stride, self.stride)  # Parent code i + 1 means we arrived by steps[i]
+        self.g_score = np.empty(len(self.open), dtype=np.int32)
+        self.parent = np.zeros(len(self.open), dtype=np.uint8)
+        self.expansions = 0
+        self.heap_pushes = 0
+    
+    def index(self, x, y):
+        return (y + 1) * self.stride + x + 1
+    
+    def position(self, index):
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
+    
+    def find_path(self, start, goal):
+        """Cheapest 4-connected path as a list of (x, y), or None"""
+        self.expansions = 0
+        self.heap_pushes = 0
+        if not (0 <= start[0] < self.width and 0 <= start[1] < self.height and
+                0 <= goal[0] < self.width and 0 <= goal[1] < self.height):
+            return None
+        open_, stride, size = self.open, self.stride, len(self.open)
+        start_index, goal_index = self.index(*start), self.index(*goal)
+        if not open_[start_index] or not open_[goal_index]:
+            return None
+        
+        self.g_score.fill(np.iinfo(np.int32).max)
+        g_score, parent = memoryview(self.g_score), memoryview(self.parent)
+        gx, gy = goal[0] + 1, goal[1] + 1
+        min_cost = self.min_cost  # Scales the Manhattan distance into a lower bound on cost
+        h_range = (self.width + self.height) * min_cost + 1  # Any h is below this
+        moves = [(step, code) for code, step in enumerate(self.steps, 1)]
+        
+        g_score[start_index] = 0
+        parent[start_index] = 0
+        h = (abs(start[0] - goal[0]) + abs(start[1] - goal[1])) * min_cost
+        frontier = [(h * h_range + h) * size + start_index]
+        pushes = 1
+        
+        while frontier:
+            packed, current = divmod(heapq.heappop(frontier), size)
+            f, h = divmod(packed, h_range)
+            cost = f - h
+            if cost > g_score[current]:
+                continue  # Stale entry: the cell was reached more cheaply since
+            if current == goal_index:
+                self.heap_pushes = pushes
+                return self.reconstruct(goal_index)
+            self.expansions += 1
+            
+            for step, code in moves:
+                neighbor = current + step
+                enter = open_[neighbor]
+                if enter and cost + enter < g_score[neighbor]:
+                    g_score[neighbor] = new_cost = cost + enter
+                    parent[neighbor] = code
+                    y, x = divmod(neighbor, stride)
+                    h = (abs(x - gx) + abs(y - gy)) * min_cost
+                    heapq.heappush(frontier, ((new_cost + h) * h_range + h) * size + neighbor)
+                    pushes += 1
+        self.heap_pushes = pushes
+        return None
+    
+    def reconstruct(self, goal_index):
+        parent, steps = memoryview(self.parent), self.steps
+        path = []
+        current = goal_index
+        while True:
+            path.append(self.position(current))
+            code = parent[current]
+            if not code:
+                return path[::-1]
+            current -= steps[code - 1]
+
+
+class WeightedGridAStar:
+    """A* over a uint8 cost grid (0 impassable) with 8-connected moves: entering a cell costs its
+    value, 1.42 times that for a diagonal move, and the octile distance scaled by the cheapest cost is
+    the heuristic. Diagonal moves may pass between two blocked cells, as 8-connected roads do. The
+    path is traced back from the goal over g-scores, keeping the direction of the last step whenever
+    an equally cheap predecessor allows it, so it runs straight where it can instead of zigzagging
+    between equal-cost cells.
+    
+    With any_angle, a cell may instead be reached in a straight line from its parent's parent when
+    every cell under the line (Bresenham) is passable, Theta*-style; such a segment costs its length
+    times the highest cost it crosses, and the heuristic becomes the straight-line distance. Paths
+    then come back as their corner points rather than every cell.
+    
+    Search state lives in flat arrays over the padded grid like GridAStar's: a g-score per cell (int32
+    unless the grid's costs could overflow it) and, only with any_angle, the parent's index.
+    """
+    def __init__(self, costs, diagonal=True, any_angle=False, min_cost=None):
+        height, width = costs.shape
+        self.setup(width, height, width + 2, diagonal, any_angle)
+        # Cost of entering each padded cell, 0 where blocked
+        self.open = bytearray(np.pad(np.asarray(costs).astype(np.uint8), 1).tobytes())
+        cells = np.frombuffer(self.open, dtype=np.uint8)
+        road = cells[cells > 0]
+        self.min_cost = min_cost or (int(road.min()) if len(road) else 1)
+        # No path's cost exceeds every open cell entered diagonally at the highest cost
+        bound = len(road) * DIAGONAL_COST * (int(road.max()) if len(road) else 1)
+        self.g_score = np.empty(len(self.open), dtype=np.int32 if bound < 2 ** 31 else np.int64)
+        self.parent = np.zeros(len(self.open), dtype=np.int32) if any_angle else None
+    
+    def setup(self, width, height, stride, diagonal, any_angle):
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.diagonal = diagonal
+        self.any_angle = any_angle
+        # (dx, dy, index step, cost multiplier in STRAIGHT_COST units)
+        self.moves = [(dx, dy, dy * stride + dx, DIAGONAL_COST if dx and dy else STRAIGHT_COST)
+                      for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                      if (dx or dy) and (diagonal or not (dx and dy))]
+        self.cost = None  # Cost of the last path found, in cost-grid units per pixel
+        self.expansions = 0
+        self.heap_pushes = 0
+    
+    def index(self, x, y):
+        return (y + 1) * self.stride + x + 1
+    
+    def position(self, index):
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
+    
+    def heuristic(self, x, y, gx, gy):
+        # Lower bound on the cost from (x, y) to the goal (find_path inlines the same formulas)
+        dx, dy = abs(x - gx), abs(y - gy)
+        if self.any_angle:
+            distance = int(math.hypot(dx, dy) * STRAIGHT_COST)
+        elif self.diagonal:
+            distance = STRAIGHT_COST * max(dx, dy) + (DIAGONAL_COST - STRAIGHT_COST) * min(dx, dy)
+        else:
+            distance = STRAIGHT_COST * (dx + dy)
+        return distance * self.min_cost
+    
+    def segment_cost(self, a, b):
+        # Cost of the straight line from cell index a to b, or None if it crosses a blocked cell
+        stride, costs = self.stride, self.open
+        ay, ax = divmod(a, stride)
+        by, bx = divmod(b, stride)
+        dx, dy = abs(bx - ax), abs(by - ay)
+        step_x, step_y = (1 if bx > ax else -1), (stride if by > ay else -stride)
+        error = dx - dy
+        index, highest = a, 0
+        while index != b:
+            twice = 2 * error
+            if twice > -dy:
+                error -= dy
+                index += step_x
+            if twice < dx:
+                error += dx
+                index += step_y
+            enter = costs[index]
+            if not enter:
+                return None
+            if enter > highest:
+                highest = enter
+        return math.ceil(math.hypot(dx, dy) * STRAIGHT_COST * highest)
+    
+    def find_path(self, start, goal):
+        """Cheapest path as a list of (x, y), or None"""
+        self.expansions = 0
+        self.heap_pushes = 0
+        self.cost = None
+        if not (0 <= start[0] < self.width and 0 <= start[1] < self.height and
+                0 <= goal[0] < self.width and 0 <= goal[1] < self.height):
+            return None
+        open_, stride, size = self.open, self.stride, len(self.open)
+        start_index, goal_index = self.index(*start), self.index(*goal)
+        if not open_[start_index] or not open_[goal_index]:
+            return None
+        
+        unreached = np.iinfo(self.g_score.dtype).max
+        self.g_score.fill(unreached)
+        g_score = memoryview(self.g_score)
+        parent = memoryview(self.parent) if self.any_angle else None
+        gx, gy = goal[0] + 1, goal[1] + 1
+        any_angle, diagonal, min_cost = self.any_angle, self.diagonal, self.min_cost
+        segment_cost = self.segment_cost
+        h_range = (self.width + self.height) * DIAGONAL_COST * min_cost + 1  # Any h is below this
+        bend = DIAGONAL_COST - STRAIGHT_COST
+        moves = [(step, weight) for _, _, step, weight in self.moves]
+        
+        g_score[start_index] = 0
+        if any_angle:
+            parent[start_index] = 0
+        h = self.heuristic(*start, *goal)
+        frontier = [(h * h_range + h) * size + start_index]
+        pushes = 1
+        
+        while frontier:
+            packed, current = divmod(heapq.heappop(frontier), size)
+            f, h = divmod(packed, h_range)
+            cost = f - h
+            if cost > g_score[current]:
+                continue  # Stale entry: the cell was reached more cheaply since
+            if current == goal_index:
+                self.heap_pushes = pushes
+                self.cost = cost / STRAIGHT_COST
+                if any_angle:
+                    return self.corner_path(goal_index, parent, 0)
+                return self.straight_path(goal_index, start_index, g_score.__getitem__)
+            self.expansions += 1
+            
+            grandparent = parent[current] if any_angle else 0
+            if grandparent:
+                grandparent_cost = g_score[grandparent]
+                py, px = divmod(grandparent, stride)
+            for step, weight in moves:
+                neighbor = current + step
+                enter = open_[neighbor]
+                if not enter:
+                    continue
+                new_cost, via = cost + enter * weight, current
+                known = g_score[neighbor]
+                y, x = divmod(neighbor, stride)
+                if grandparent and (abs(x - px) > 1 or abs(y - py) > 1) and \
+                        (known == unreached or parent[neighbor] != grandparent):
+                    # Theta*: the straight line from current's parent, if clear and no dearer. The line
+                    # costs at least its length times this cell's cost, which usually saves tracing it.
+                    shortest = grandparent_cost + int(math.hypot(x - px, y - py) * STRAIGHT_COST) * enter
+                    if shortest <= new_cost and shortest < known:
+                        segment = segment_cost(grandparent, neighbor)
+                        if segment is not None and grandparent_cost + segment <= new_cost:
+                            new_cost, via = grandparent_cost + segment, grandparent
+                if new_cost < known:
+                    g_score[neighbor] = new_cost
+                    hx, hy = abs(x - gx), abs(y - gy)
+                    if any_angle:
+                        parent[neighbor] = via
+                        h = int(math.hypot(hx, hy) * STRAIGHT_COST) * min_cost
+                    elif diagonal:
+                        h = (STRAIGHT_COST * hx + bend * hy if hx > hy else STRAIGHT_COST * hy + bend * hx) * min_cost
+                    else:
+                        h = STRAIGHT_COST * (hx + hy) * min_cost
+                    heapq.heappush(frontier, ((new_cost + h) * h_range + h) * size + neighbor)
+                    pushes += 1
+        self.heap_pushes = pushes
+        return None
+    
+    def corner_path(self, goal_index, parent, none):
+        # Any-angle path: follow parent links (none marks the start) back from the goal
+        path = []
+        current = goal_index
+        while current != none:
+            path.append(self.position(current))
+            current = parent[current]
+        return path[::-1]
+    
+    def straight_path(self, goal_index, start_index, g_score):
+        """Cheapest path traced back from the goal: each step goes to a neighbour whose g-score (from
+        the g_score lookup) plus the step's cost gives the current cell's, so every choice stays on a
+        cheapest path. The direction of the last step is tried first, which turns zigzags between
+        equally cheap cells into straight runs."""
+        costs, moves = self.open, self.moves
+        width, height = self.width, self.height
+        path = [self.position(goal_index)]
+        current, last = goal_index, None
+        while current != start_index:
+            here, enter = g_score(current), costs[current]
+            x, y = path[-1]
+            for move in ([last] if last else []) + moves:
+                dx, dy, step, weight = move
+                if 0 <= x - dx < width and 0 <= y - dy < height and g_score(current - step) == here - enter * weight:
+                    current, last = current - step, move
+                    path.append((x - dx, y - dy))
+                    break
+        return path[::-1]
+
+
+class MappedGridAStar(WeightedGridAStar):
+    """WeightedGridAStar for grids too large for its per-cell arrays: costs are read straight from the
+    uint8 cost grid, which may be a read-only memory map (only the pages a search touches are read),
+    and g-scores and parents live in dicts sized by the area actually explored. Cells are indexed
+    without padding, so moves off the grid's edge are checked for instead."""
+    def __init__(self, costs, min_cost, diagonal=True, any_angle=False):
+        height, width = costs.shape
+        self.setup(width, height, width, diagonal, any_angle)
+        self.open = memoryview(np.ascontiguousarray(costs)).cast("B")
+        self.min_cost = min_cost  # Lowest cost in the grid (not scanned for, to keep pages untouched)
+    
+    def index(self, x, y):
+        return y * self.width + x
+    
+    def position(self, index):
+        y, x = divmod(index, self.width)
+        return x, y
+    
+    def find_path(self, start, goal):
+        """Cheapest path as a list of (x, y), or None"""
+        self.expansions = 0
+        self.heap_pushes = 0
+        self.cost = None
+        width, height, costs = self.width, self.height, self.open
+        if not (0 <= start[0] < width and 0 <= start[1] < height and
+                0 <= goal[0] < width and 0 <= goal[1] < height):
+            return None
+        start_index, goal_index = self.index(*start), self.index(*goal)
+        if not costs[start_index] or not costs[goal_index]:
+            return None
+        
+        size = width * height
+        gx, gy = goal
+        any_angle, diagonal, min_cost = self.any_angle, self.diagonal, self.min_cost
+        segment_cost, moves = self.segment_cost, self.moves
+        h_range = (width + height) * DIAGONAL_COST * min_cost + 1  # Any h is below this
+        bend = DIAGONAL_COST - STRAIGHT_COST
+        inf = math.inf
+        
+        g_score = {start_index: 0}
+        parent = {start_index: None} if any_angle else None
+        h = self.heuristic(*start, gx, gy)
+        frontier = [(h * h_range + h) * size + start_index]
+        pushes = 1
+        
+        while frontier:
+            packed, current = divmod(heapq.heappop(frontier), size)
+            f, h = divmod(packed, h_range)
+            cost = f - h
+            if cost > g_score[current]:
+                continue  # Stale entry: the cell was reached more cheaply since
+            if current == goal_index:
+                self.heap_pushes = pushes
+                self.cost = cost / STRAIGHT_COST
+                if any_angle:
+                    return self.corner_path(goal_index, parent, None)
+                return self.straight_path(goal_index, start_index, lambda index: g_score.get(index, -1))
+            self.expansions += 1
+            
+            y, x = divmod(current, width)
+            border = x == 0 or y == 0 or x == width - 1 or y == height - 1
+            grandparent = parent[current] if any_angle else None
+            if grandparent is not None:
+                grandparent_cost = g_score[grandparent]
+                py, px = divmod(grandparent, width)
+            for dx, dy, step, weight in moves:
+                nx, ny = x + dx, y + dy
+                if border and not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                neighbor = current + step
+                enter = costs[neighbor]
+                if not enter:
+                    continue
+                new_cost, via = cost + enter * weight, current
+                known = g_score.get(neighbor, inf)
+                if grandparent is not None and (abs(nx - px) > 1 or abs(ny - py) > 1) and \
+                        parent.get(neighbor) != grandparent:
+                    # Theta*, as in WeightedGridAStar.find_path
+                    shortest = grandparent_cost + int(math.hypot(nx - px, ny - py) * STRAIGHT_COST) * enter
+                    if shortest <= new_cost and shortest < known:
+                        segment = segment_cost(grandparent, neighbor)
+                        if segment is not None and grandparent_cost + segment <= new_cost:
+                            new_cost, via = grandparent_cost + segment, grandparent
+                if new_cost < known:
+                    g_score[neighbor] = new_cost
+                    hx, hy = abs(nx - gx), abs(ny - gy)
+                    if any_angle:
+                        parent[neighbor] = via
+                        h = int(math.hypot(hx, hy) * STRAIGHT_COST) * min_cost
+                    elif diagonal:
+                        h = (STRAIGHT_COST * hx + bend * hy if hx > hy else STRAIGHT_COST * hy + bend * hx) * min_cost
+                    else:
+                        h = STRAIGHT_COST * (hx + hy) * min_cost
+                    heapq.heappush(frontier, ((new_cost + h) * h_range + h) * size + neighbor)
+                    pushes += 1
+        self.heap_pushes = pushes
+        return None
@@ -1,31 +1,74 @@
 
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk, ImageDraw
+from PIL import Image
 import numpy as np
-import heapq
+from grid_search import MappedGridAStar, WeightedGridAStar
+from contraction import ContractionHierarchy
+from map_cache import MapCache, image_key
+from map_view import MapViewport
+from map_tour import plan_tour
+from segmentation import class_tables, classify, close_gaps
+
+# Road colours: PIL hue (0-255 scale) strictly between the bounds, saturation and value above the
+# minimums. Routes prefer low costs: a pixel of cost 2 counts as two of cost 1. Cached results are
+# keyed on these settings too. By default only the yellow road lines are roads.
+ROAD_CLASSES = (
+    {"name": "road", "hue": (20, 40), "min_saturation": 100, "min_value": 100, "cost": 1},
+)
+ROAD_TABLES = class_tables(ROAD_CLASSES)
+# Opt-in (MapRouteFinder(root, CITY_ROAD_CLASSES)): orange main roads are routable too, and
+# preferred over the yellow roads
+CITY_ROAD_CLASSES = (
+    {"name": "main road", "hue": (8, 20), "min_saturation": 100, "min_value": 100, "cost": 1},
+    {"name": "road", "hue": (20, 40), "min_saturation": 100, "min_value": 100, "cost": 2},
+)
+CLOSE_RADIUS = 1  # Closes gaps of up to two pixels left by antialiasing and JPEG noise
+
+TILE_ROWS = 512  # Image rows converted to HSV at a time
+ARRAY_SEARCH_MAX_PIXELS = 4096 * 4096  # Larger maps run cell A* on the memory-mapped grid, without per-cell arrays
+
+# Scanned city maps are far beyond PIL's decompression-bomb limit, and they are the user's own files
+Image.MAX_IMAGE_PIXELS = None
+
+
+def road_costs(image, tables=ROAD_TABLES):
+    """Travel cost of every pixel of image (0 off the roads), with small gaps closed"""
+    return close_gaps(classify(np.asarray(image.convert('HSV')), tables), CLOSE_RADIUS)
+
+
+def fill_road_costs(image, costs, rows=TILE_ROWS, tables=ROAD_TABLES):
+    # Classify the image one band of rows at a time into costs, so only a band is ever held as HSV.
+    # Each band is read with 2 * CLOSE_RADIUS rows of context either side, which makes closing
+    # match a pass over the whole image.
+    width, height = image.size
+    context = 2 * CLOSE_RADIUS
+    for top in range(0, height, rows):
+        bottom = min(top + rows, height)
+        above, below = max(top - context, 0), min(bottom + context, height)
+        band = road_costs(image.crop((0, above, width, below)), tables)
+        costs[top:bottom] = band[top - above:bottom - above]
 
-class Node:
-    def __init__(self, state, parent=None, g=0, h=0):
-        self.state = state  # (x, y) coordinates
-        self.parent = parent
-        self.g = g  # Cost from start to node
-        self.h = h  # Heuristic (estimated cost to goal)
-        self.f = g + h  # Total cost
-    
-    def __lt__(self, other):
-        return self.f < other.f
 
 class MapRouteFinder:
-    def __init__(self, root):
+    def __init__(self, root, road_classes=ROAD_CLASSES):
         self.root = root
+        self.road_classes = road_classes
+        self.road_tables = class_tables(road_classes)
         self.root.title("Map Route Finder - A* Search")
         
         self.original_image = None
-        self.processed_image = None
-        self.display_image = None
+        self.road_graph = None
+        self.hierarchy = None
+        self.cache = MapCache()
+        self.cache_key = None
+        self.costs = None
+        self.components = None
+        self.grid_searches = {}  # any_angle -> cell search over the cost grid, set up on first use
         self.start_point = None
         self.end_point = None
+        self.stops = []
         self.route = None
         
         self.setup_ui()
@@ -46,9 +89,18 @@ class MapRouteFinder:
         self.clear_button = tk.Button(control_frame, text="Clear Points", command=self.clear_points)
         self.clear_button.pack(side=tk.LEFT, padx=5)
         
+        self.preprocess_button = tk.Button(control_frame, text="Speed Up Routing", command=self.build_hierarchy, state=tk.DISABLED)
+        self.preprocess_button.pack(side=tk.LEFT, padx=5)
+        
+        self.tour_button = tk.Button(control_frame, text="Plan Tour", command=self.show_tour, state=tk.DISABLED)
+        self.tour_button.pack(side=tk.LEFT, padx=5)
+        
         self.canvas = tk.Canvas(main_frame, bg="gray")
         self.canvas.pack(fill=tk.BOTH, expand=True)
         self.canvas.bind("<ButtonPress-1>", self.on_canvas_click)
+        self.canvas.bind("<Shift-ButtonPress-1>", self.on_canvas_shift_click)
+        # Mouse wheel zooms, dragging with the right (or middle) button pans
+        self.view = MapViewport(self.canvas)
     
     def load_image(self):
         file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.jpeg *.png *.bmp")])
@@ -56,96 +108,133 @@ class MapRouteFinder:
             return
         try:
             self.original_image = Image.open(file_path)
+            self.cache_key = image_key(file_path, (self.road_classes, CLOSE_RADIUS))
             self.process_image()
-            self.display_image = self.original_image.copy()
-            self.update_canvas()
+            # A hierarchy built for this image earlier is reused if it matches this road graph
+            self.hierarchy = ContractionHierarchy.load(self.hierarchy_path(), self.road_graph)
+            self.preprocess_button.config(state=tk.DISABLED if self.hierarchy else tk.NORMAL)
+            self.view.show(self.original_image)
+            self.draw_points()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load image: {str(e)}")
     
     def process_image(self):
-        hsv_image = self.original_image.convert('HSV')
-        np_image = np.array(hsv_image)
-        yellow_mask = (np_image[:,:,0] > 20) & (np_image[:,:,0] < 40) & (np_image[:,:,1] > 100) & (np_image[:,:,2] > 100)
-        self.processed_image = np.where(yellow_mask, 255, 0).astype(np.uint8)
+        # The cost grid (memory-mapped), the skeleton's junction graph and the roads' components come
+        # from the cache for images seen before; all are shared by every route query on this image
+        width, height = self.original_image.size
+        self.costs, self.road_graph, self.components = self.cache.get(
+            self.cache_key, width, height, lambda costs: fill_road_costs(self.original_image, costs, tables=self.road_tables))
+        self.grid_searches = {}
+    
+    def hierarchy_path(self):
+        return self.cache.path(self.cache_key, ".ch.npz")
+    
+    def build_hierarchy(self):
+        # Optional one-off preprocessing: contraction hierarchy over the road graph, cached with it
+        if self.road_graph is None:
+            return
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        try:
+            self.hierarchy = ContractionHierarchy.build(self.road_graph)
+            os.makedirs(self.cache.directory, exist_ok=True)
+            self.hierarchy.save(self.hierarchy_path())
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to save route preprocessing: {str(e)}")
+        finally:
+            self.root.config(cursor="")
+        self.preprocess_button.config(state=tk.DISABLED)
     
     def on_canvas_click(self, event):
-        x, y = event.x, event.y
+        # Points are kept in image coordinates, whatever the current zoom and pan
+        point = self.view.to_image(event.x, event.y)
+        if point is None:
+            return
         if self.start_point is None:
-            self.start_point = (x, y)
+            self.start_point = point
         elif self.end_point is None:
-            self.end_point = (x, y)
+            self.end_point = point
             self.find_route_button.config(state=tk.NORMAL)
-        self.display_image = self.original_image.copy()
         self.draw_points()
-        self.update_canvas()
     
-    def draw_points(self):
-        if self.display_image is None:
+    def on_canvas_shift_click(self, event):
+        # Shift-click adds a delivery stop for Plan Tour, which starts from the start point
+        point = self.view.to_image(event.x, event.y)
+        if point is None:
             return
-        draw = ImageDraw.Draw(self.display_image)
+        self.stops.append(point)
+        self.tour_button.config(state=tk.NORMAL)
+        self.draw_points()
+    
+    def draw_points(self):
+        points = [(*stop, 'orange') for stop in self.stops]
         if self.start_point:
-            x, y = self.start_point
-            draw.ellipse((x-5, y-5, x+5, y+5), fill='red', outline='white')
+            points.append((*self.start_point, 'red'))
         if self.end_point:
-            x, y = self.end_point
-            draw.ellipse((x-5, y-5, x+5, y+5), fill='green', outline='white')
-        if self.route:
-            for i in range(1, len(self.route)):
-                draw.line([self.route[i-1], self.route[i]], fill='blue', width=3)
-    
-    def update_canvas(self):
-        if self.display_image is None:
-            return
-        self.tk_image = ImageTk.PhotoImage(self.display_image)
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.tk_image)
+            points.append((*self.end_point, 'green'))
+        self.view.set_overlay(points, self.route)
     
     def find_route(self):
-        if not self.start_point or not self.end_point or self.processed_image is None:
+        if not self.start_point or not self.end_point or self.road_graph is None:
             return
-        road_map = np.array(self.processed_image)
-        self.route = self.a_star_search(road_map, self.start_point, self.end_point)
+        # Both clicks snap to the nearest road centre line; the search runs over junctions only, and
+        # only upward through the hierarchy once one is built
+        router = self.hierarchy or self.road_graph
+        self.route = router.find_route(self.start_point, self.end_point)
         if not self.route:
-            messagebox.showinfo("No Route Found", "No valid route could be found along the yellow lines.")
-        self.display_image = self.original_image.copy()
+            messagebox.showinfo("No Route Found", "No valid route could be found along the roads.")
         self.draw_points()
-        self.update_canvas()
     
-    def a_star_search(self, road_map, start, goal):
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
-        
-        open_set = []
-        heapq.heappush(open_set, Node(start, None, 0, heuristic(start, goal)))
-        visited = set()
-        
-        while open_set:
-            current = heapq.heappop(open_set)
-            if current.state in visited:
-                continue
-            visited.add(current.state)
-            if current.state == goal:
-                return self.reconstruct_path(current)
-            x, y = current.state
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nx, ny = x+dx, y+dy
-                if 0 <= nx < road_map.shape[1] and 0 <= ny < road_map.shape[0] and road_map[ny, nx] == 255:
-                    heapq.heappush(open_set, Node((nx, ny), current, current.g + 1, heuristic((nx, ny), goal)))
-        return None
+    def show_tour(self):
+        if not self.start_point or not self.stops or self.road_graph is None:
+            return
+        tour = self.plan_tour(self.start_point, self.stops)
+        if tour is None:
+            self.route = None
+            messagebox.showinfo("No Route Found", "Some stops cannot be reached along the roads.")
+        else:
+            order, self.route = tour
+            self.stops = [self.stops[i] for i in order]
+        self.draw_points()
+    
+    def bidirectional_search(self, start, goal):
+        # Same routes as find_route, grown from both ends until they meet
+        return self.road_graph.find_route_bidirectional(start, goal)
     
-    def reconstruct_path(self, node):
-        path = []
-        while node:
-            path.append(node.state)
-            node = node.parent
-        return path[::-1]
+    def routes_to_many(self, start, goals):
+        """Routes from start to each goal (None where unreachable) from one Dijkstra sweep"""
+        return self.road_graph.routes_from(start, goals)
+    
+    def plan_tour(self, start, stops, return_to_start=False):
+        """(visiting order as indices into stops, whole route) for a short multi-stop journey, or None"""
+        return plan_tour(self.road_graph, start, stops, return_to_start)
+    
+    def a_star_search(self, start, goal, any_angle=False):
+        """Cell-by-cell A* on the full cost grid (find_route searches the road graph instead): 8-connected
+        moves, or straight any-angle segments between corner points with any_angle. Points on
+        different road components cannot be joined, which is known without a search."""
+        start_label, goal_label = self.components.label_at(*start), self.components.label_at(*goal)
+        if start_label is None or start_label != goal_label:
+            return None
+        search = self.grid_searches.get(any_angle)
+        if search is None:
+            min_cost = min(c["cost"] for c in self.road_classes)
+            width, height = self.original_image.size
+            if width * height <= ARRAY_SEARCH_MAX_PIXELS:
+                search = WeightedGridAStar(self.costs, any_angle=any_angle, min_cost=min_cost)
+            else:
+                search = MappedGridAStar(self.costs, min_cost, any_angle=any_angle)
+            self.grid_searches[any_angle] = search
+        return search.find_path(start, goal)
     
     def clear_points(self):
         self.start_point = None
         self.end_point = None
+        self.stops = []
         self.route = None
         self.find_route_button.config(state=tk.DISABLED)
-        self.display_image = self.original_image.copy()
-        self.update_canvas()
+        self.tour_button.config(state=tk.DISABLED)
+        self.draw_points()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,586 @@
+import argparse
+import heapq
+import itertools
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from grid_search import JumpPointSearch, GridAStar, MappedGridAStar, WeightedGridAStar
+from maze_grid import MazeGrid, PATH
+from maze_planner import a_star_search
+from road_graph import RoadGraph, thin
+from contraction import ContractionHierarchy
+from map import CITY_ROAD_CLASSES, CLOSE_RADIUS, ROAD_CLASSES, ROAD_TABLES, fill_road_costs, road_costs
+from map_tour import nearest_neighbour_order, plan_tour, tour_length, two_opt
+from map_cache import MapCache, image_key, open_grid
+from segmentation import RoadComponents, class_tables, classify
+
+
+def synthetic_road_mask(width, height, seed=0, roads=40, road_width=5):
+    """Boolean road layer resembling a city map: long straight and angled roads of a few pixels"""
+    rng = random.Random(seed)
+    image = Image.new("1", (width, height), 0)
+    draw = ImageDraw.Draw(image)
+    for _ in range(roads):
+        kind = rng.random()
+        if kind < 0.4:
+            y = rng.randrange(height)
+            draw.line([(0, y), (width - 1, y)], fill=1, width=road_width)
+        elif kind < 0.8:
+            x = rng.randrange(width)
+            draw.line([(x, 0), (x, height - 1)], fill=1, width=road_width)
+        else:
+            draw.line([(rng.randrange(width), rng.randrange(height)),
+                       (rng.randrange(width), rng.randrange(height))], fill=1, width=road_width)
+    return np.array(image, dtype=bool)
+
+
+def road_pairs(mask, count, seed):
+    rng = random.Random(seed)
+    ys, xs = np.nonzero(mask)
+    picks = [rng.randrange(len(xs)) for _ in range(2 * count)]
+    points = [(int(xs[i]), int(ys[i])) for i in picks]
+    return list(zip(points[::2], points[1::2]))
+
+
+class CountingGrid:
+    # Cell-level A* over a mask, counting expansions (each expansion pushes up to four entries)
+    def __init__(self, mask):
+        self.grid = MazeGrid(mask.shape[1], mask.shape[0])
+        self.grid.cells[mask] = PATH
+        self.expansions = 0
+    
+    def neighbors(self, x, y):
+        self.expansions += 1
+        return self.grid.neighbors(x, y)
+
+
+class Node:
+    # The per-push node of map.py's original A*, kept as the baseline
+    def __init__(self, state, parent=None, g=0, h=0):
+        self.state = state
+        self.parent = parent
+        self.g = g
+        self.h = h
+        self.f = g + h
+    
+    def __lt__(self, other):
+        return self.f < other.f
+
+
+def node_a_star(road_map, start, goal):
+    # map.py's original A*: a Node per push, a visited set of tuples, duplicates left in the heap
+    def heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    
+    open_set = []
+    heapq.heappush(open_set, Node(start, None, 0, heuristic(start, goal)))
+    visited = set()
+    
+    while open_set:
+        current = heapq.heappop(open_set)
+        if current.state in visited:
+            continue
+        visited.add(current.state)
+        if current.state == goal:
+            path = []
+            while current:
+                path.append(current.state)
+                current = current.parent
+            return path[::-1]
+        x, y = current.state
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < road_map.shape[1] and 0 <= ny < road_map.shape[0] and road_map[ny, nx] == 255:
+                heapq.heappush(open_set, Node((nx, ny), current, current.g + 1, heuristic((nx, ny), goal)))
+    return None
+
+
+def peak_memory(function, *args):
+    # Peak bytes allocated while running function (NumPy buffers are traced too)
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_astar(args):
+    print(f"{'size':>11} {'Node ms':>9} {'array ms':>9} {'JPS ms':>8} {'Node MB':>8} {'array MB':>9}  same length")
+    for size in args.sizes:
+        mask = synthetic_road_mask(size, size, args.seed)
+        road_map = np.where(mask, 255, 0).astype(np.uint8)
+        pairs = road_pairs(mask, args.queries, args.seed)
+        
+        start = time.perf_counter()
+        node_paths = [node_a_star(road_map, a, b) for a, b in pairs]
+        node_time = time.perf_counter() - start
+        
+        search = GridAStar(mask)
+        start = time.perf_counter()
+        array_paths = [search.find_path(a, b) for a, b in pairs]
+        array_time = time.perf_counter() - start
+        
+        jps = JumpPointSearch(mask)
+        start = time.perf_counter()
+        for a, b in pairs:
+            jps.find_path(a, b)
+        jps_time = time.perf_counter() - start
+        
+        # Memory for the longest query; the array search counts its arrays, allocated with the grid
+        a, b = max(zip(pairs, node_paths), key=lambda item: len(item[1] or ()))[0]
+        node_memory = peak_memory(node_a_star, road_map, a, b)
+        array_memory = peak_memory(lambda: GridAStar(mask).find_path(a, b))
+        
+        same = all((p is None) == (q is None) and (p is None or len(p) == len(q)) for p, q in zip(node_paths, array_paths))
+        n = args.queries
+        print(f"{f'{size}x{size}':>11} {node_time / n * 1000:9.1f} {array_time / n * 1000:9.1f} "
+              f"{jps_time / n * 1000:8.2f} {node_memory / 2 ** 20:8.1f} {array_memory / 2 ** 20:9.1f}  {same}")
+
+
+def bench_jps(args):
+    print(f"{'size':>11} {'A* exp':>9} {'JPS exp':>8} {'JPS pushes':>10} {'A* ms':>9} {'JPS ms':>8}  same length")
+    for size in args.sizes:
+        mask = synthetic_road_mask(size, size, args.seed)
+        pairs = road_pairs(mask, args.queries, args.seed)
+        
+        grid = CountingGrid(mask)
+        start = time.perf_counter()
+        a_star_paths = [a_star_search(grid, a, b) for a, b in pairs]
+        a_star_time = time.perf_counter() - start
+        
+        jps = JumpPointSearch(mask)
+        expansions = pushes = 0
+        jps_paths = []
+        start = time.perf_counter()
+        for a, b in pairs:
+            jps_paths.append(jps.find_path(a, b))
+            expansions += jps.expansions
+            pushes += jps.heap_pushes
+        jps_time = time.perf_counter() - start
+        
+        same = all((p is None) == (q is None) and (p is None or len(p) == len(q)) for p, q in zip(a_star_paths, jps_paths))
+        n = args.queries
+        print(f"{f'{size}x{size}':>11} {grid.expansions / n:9.0f} {expansions / n:8.0f} {pushes / n:10.0f} "
+              f"{a_star_time / n * 1000:9.2f} {jps_time / n * 1000:8.2f}  {same}")
+
+
+def ring_road_mask(size, road_width=3):
+    # A single closed road with no junctions, which the graph has to promote to a node of its own
+    y, x = np.mgrid[:size, :size]
+    distance = np.abs(x - size // 2) + np.abs(y - size // 2)
+    return np.abs(distance - size // 3) < road_width
+
+
+def bench_graph(args):
+    print(f"{'size':>11} {'thin ms':>8} {'graph ms':>9} {'nodes':>6} {'edges':>6} {'A* ms':>8} {'graph ms':>9} "
+          f"{'graph exp':>9}  same reachability")
+    for size in args.sizes:
+        mask = synthetic_road_mask(size, size, args.seed)
+        pairs = road_pairs(mask, args.queries, args.seed)
+        
+        start = time.perf_counter()
+        skeleton = thin(mask)
+        thin_time = time.perf_counter() - start
+        start = time.perf_counter()
+        graph = RoadGraph(skeleton)
+        graph_time = time.perf_counter() - start
+        
+        search = GridAStar(mask)
+        start = time.perf_counter()
+        cell_routes = [search.find_path(a, b) for a, b in pairs]
+        cell_time = time.perf_counter() - start
+        
+        expansions = 0
+        graph_routes = []
+        start = time.perf_counter()
+        for a, b in pairs:
+            graph_routes.append(graph.find_route(a, b))
+            expansions += graph.expansions
+        query_time = time.perf_counter() - start
+        
+        same = all((p is None) == (q is None) for p, q in zip(cell_routes, graph_routes))
+        n = args.queries
+        print(f"{f'{size}x{size}':>11} {thin_time * 1000:8.0f} {graph_time * 1000:9.0f} {len(graph.nodes):6} "
+              f"{len(graph.edges):6} {cell_time / n * 1000:8.2f} {query_time / n * 1000:9.3f} {expansions / n:9.0f}  {same}")
+    
+    # Ring roads: the graph of a loop-only mask must route between opposite sides of the ring
+    for size in (64, 257):
+        mask = ring_road_mask(size)
+        pairs = road_pairs(mask, args.queries, args.seed)
+        graph = RoadGraph.from_mask(mask)
+        search = GridAStar(mask)
+        same = all((graph.find_route(a, b) is None) == (search.find_path(a, b) is None) for a, b in pairs)
+        print(f"{f'ring {size}x{size}':>11} {len(graph.nodes):6} nodes {len(graph.edges):6} edges  {same}")
+
+
+def route_length(route):
+    return sum(math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(route, route[1:]))
+
+
+def route_turns(route):
+    # Changes of direction along a route, whether given cell by cell or by corner points
+    directions = []
+    for (x1, y1), (x2, y2) in zip(route, route[1:]):
+        dx, dy = x2 - x1, y2 - y1
+        divisor = math.gcd(dx, dy) or 1
+        directions.append((dx // divisor, dy // divisor))
+    return sum(a != b for a, b in zip(directions, directions[1:]))
+
+
+def bench_hierarchy(args):
+    # Query times are full routes (snapping and pixel expansion included) and the search alone
+    print(f"{'size':>11} {'nodes':>6} {'build s':>8} {'load ms':>8} {'KB':>6} {'graph ms':>9} {'CH ms':>7} "
+          f"{'graph search':>12} {'CH search':>9} {'settled':>7} {'found':>6} {'max dev':>7}")
+    for size in args.sizes:
+        graph = RoadGraph.from_mask(synthetic_road_mask(size, size, args.seed, roads=args.roads))
+        rng = random.Random(args.seed)
+        pairs = [((rng.randrange(size), rng.randrange(size)), (rng.randrange(size), rng.randrange(size)))
+                 for _ in range(args.queries)]
+        
+        start = time.perf_counter()
+        hierarchy = ContractionHierarchy.build(graph)
+        build_time = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "map.ch.npz")
+            hierarchy.save(path)
+            start = time.perf_counter()
+            hierarchy = ContractionHierarchy.load(path, graph)
+            load_time = time.perf_counter() - start
+            size_kb = os.path.getsize(path) / 1024
+        
+        def timed(router):
+            settled = 0
+            start = time.perf_counter()
+            routes = []
+            for a, b in pairs:
+                routes.append(router.find_route(a, b))
+                settled += getattr(router, "settled", 0)
+            return routes, (time.perf_counter() - start) / len(pairs), settled / len(pairs)
+        
+        graph_routes, graph_time, _ = timed(graph)
+        ch_routes, ch_time, _ = timed(hierarchy)
+        # Ties between equal-cost junction chains can pick different pixels through a junction cluster
+        found = all((p is None) == (q is None) for p, q in zip(graph_routes, ch_routes))
+        deviation = max((abs(route_length(p) - route_length(q)) for p, q in zip(graph_routes, ch_routes)
+                         if p and q), default=0)
+        
+        graph.route_pixels = lambda *route: []  # Search only from here on
+        _, graph_search, _ = timed(graph)
+        _, ch_search, settled = timed(hierarchy)
+        print(f"{f'{size}x{size}':>11} {len(graph.nodes):6} {build_time:8.2f} {load_time * 1000:8.1f} {size_kb:6.0f} "
+              f"{graph_time * 1000:9.2f} {ch_time * 1000:7.2f} {graph_search * 1000:12.2f} {ch_search * 1000:9.2f} "
+              f"{settled:7.0f} {found!s:>6} {deviation:7.2f}")
+
+
+def bench_multi(args):
+    # One-way versus bidirectional A*, N searches versus one sweep to N goals, and tour orders
+    # against the order the stops were given in and (for few stops) the best possible order
+    print(f"{'size':>11} {'nodes':>6} {'A* exp':>7} {'bi exp':>7} {'A* ms':>6} {'bi ms':>6} "
+          f"{f'{args.goals} A* ms':>10} {'sweep ms':>9} {'given':>7} {'NN':>7} {'2-opt':>7} {'best':>7}")
+    for size in args.sizes:
+        graph = RoadGraph.from_mask(synthetic_road_mask(size, size, args.seed, roads=args.roads))
+        rng = random.Random(args.seed)
+        points = [(rng.randrange(size), rng.randrange(size)) for _ in range(2 * args.queries)]
+        pairs = list(zip(points[::2], points[1::2]))
+        
+        def timed(search):
+            expansions = 0
+            start = time.perf_counter()
+            for a, b in pairs:
+                search(a, b)
+                expansions += graph.expansions
+            return (time.perf_counter() - start) / len(pairs), expansions / len(pairs)
+        
+        one_way_time, one_way_expansions = timed(graph.find_route)
+        both_time, both_expansions = timed(graph.find_route_bidirectional)
+        
+        start_point, goals = points[0], points[1:args.goals + 1]
+        start = time.perf_counter()
+        separate = [graph.find_route(start_point, goal) for goal in goals]
+        separate_time = time.perf_counter() - start
+        start = time.perf_counter()
+        swept = graph.routes_from(start_point, goals)
+        sweep_time = time.perf_counter() - start
+        assert [route is None for route in separate] == [route is None for route in swept]
+        
+        # Tour over a handful of reachable stops
+        stops = [goal for goal, route in zip(goals, swept) if route][:args.stops]
+        locations = [graph.snap(point) for point in [start_point] + stops]
+        distances = [[cost for cost, _ in graph.sweep(location, locations)[0]] for location in locations]
+        given = tour_length(list(range(len(locations))), distances)
+        greedy = nearest_neighbour_order(distances)
+        improved = two_opt(greedy, distances)
+        best = min(tour_length((0,) + order, distances) for order in itertools.permutations(range(1, len(locations))))
+        assert plan_tour(graph, start_point, stops) is not None
+        print(f"{f'{size}x{size}':>11} {len(graph.nodes):6} {one_way_expansions:7.0f} {both_expansions:7.0f} "
+              f"{one_way_time * 1000:6.2f} {both_time * 1000:6.2f} {separate_time * 1000:10.1f} {sweep_time * 1000:9.1f} "
+              f"{given:7.0f} {tour_length(greedy, distances):7.0f} {tour_length(improved, distances):7.0f} {best:7.0f}")
+
+
+def synthetic_map_image(size, seed):
+    # Yellow roads on a grey background, like the maps map.py is meant for
+    mask = synthetic_road_mask(size, size, seed)
+    pixels = np.full((size, size, 3), 90, dtype=np.uint8)
+    pixels[mask] = (240, 200, 30)
+    return Image.fromarray(pixels)
+
+
+def noisy_map_image(size, seed, gaps=300):
+    # Orange main roads and yellow side roads, broken by one- and two-pixel gaps and saved as a JPEG,
+    # like a scanned or screenshotted map
+    rng = random.Random(seed)
+    mask = synthetic_road_mask(size, size, seed)
+    main = synthetic_road_mask(size, size, seed + 1, roads=8, road_width=7)
+    pixels = np.full((size, size, 3), 90, dtype=np.uint8)
+    pixels[mask] = (240, 200, 30)
+    pixels[main] = (245, 140, 20)
+    ys, xs = np.nonzero(mask | main)
+    for _ in range(gaps):
+        i = rng.randrange(len(xs))
+        width = rng.choice((1, 2))
+        if rng.random() < 0.5:
+            pixels[max(ys[i] - 8, 0):ys[i] + 8, xs[i]:xs[i] + width] = 90
+        else:
+            pixels[ys[i]:ys[i] + width, max(xs[i] - 8, 0):xs[i] + 8] = 90
+    with tempfile.TemporaryFile() as f:
+        Image.fromarray(pixels).save(f, format="JPEG", quality=75)
+        f.seek(0)
+        return Image.open(f).convert("RGB")
+
+
+def bench_segment(args):
+    # The yellow-only default threshold against the city road classes plus closing, on a noisy map:
+    # components, the share of road pixels in the biggest one, and how quickly a disconnected pair
+    # is refused (full cell A* failing against the component lookup)
+    city_tables = class_tables(CITY_ROAD_CLASSES)
+    print(f"{'size':>11} {'classify ms':>11} {'close ms':>9} {'labels ms':>10} {'old comps':>10} {'comps':>6} "
+          f"{'old main':>10} {'main':>7} {'refuse A* ms':>12} {'refuse ms':>10}")
+    for size in args.sizes:
+        image = noisy_map_image(size, args.seed)
+        hsv = np.asarray(image.convert("HSV"))
+        old = classify(hsv, ROAD_TABLES)
+        start = time.perf_counter()
+        raw = classify(hsv, city_tables)
+        classify_time = time.perf_counter() - start
+        start = time.perf_counter()
+        costs = road_costs(image, city_tables)
+        close_time = time.perf_counter() - start - classify_time
+        start = time.perf_counter()
+        components = RoadComponents.from_grid(costs)
+        label_time = time.perf_counter() - start
+        old_components = RoadComponents.from_grid(old)
+        
+        # Share of road pixels in the biggest component
+        def main_share(components):
+            sizes = np.bincount(components.labels, weights=components.ends - components.starts)
+            return sizes.max() / sizes.sum()
+        
+        # Refusing routes from the biggest component to each of the others (at most five): a full
+        # search exhausts the start's component first
+        sizes = np.bincount(components.labels, weights=components.ends - components.starts)
+        main = int(np.argmax(sizes))
+        first_run = {}
+        for i, label in enumerate(components.labels.tolist()):
+            first_run.setdefault(label, i)
+        point = lambda i: (int(components.starts[i]), int(components.rows[i]))
+        apart = [(point(first_run[main]), point(first_run[label])) for label in first_run if label != main][:5]
+        search = GridAStar(costs)
+        start = time.perf_counter()
+        assert all(search.find_path(a, b) is None for a, b in apart)
+        search_time = (time.perf_counter() - start) / max(len(apart), 1)
+        start = time.perf_counter()
+        assert all(components.label_at(*a) != components.label_at(*b) for a, b in apart)
+        refuse_time = (time.perf_counter() - start) / max(len(apart), 1)
+        print(f"{f'{size}x{size}':>11} {classify_time * 1000:11.0f} {close_time * 1000:9.0f} {label_time * 1000:10.0f} "
+              f"{old_components.count:10} {components.count:6} {main_share(old_components):10.1%} "
+              f"{main_share(components):7.1%} {search_time * 1000:12.1f} {refuse_time * 1000:10.3f}")
+
+
+def bench_tiles(args):
+    # Peak NumPy memory (PIL's own buffers are not traced) of classifying a whole image at once
+    # against banded classification into a memory-mapped cost grid, the road graph built from that
+    # grid band by band; then cell A* with per-cell arrays against A* reading the memory-mapped grid
+    print(f"{'size':>11} {'whole ms':>9} {'whole MB':>9} {'tiled ms':>9} {'tiled MB':>9} {'graph ms':>9} "
+          f"{'graph MB':>9} {'array A* ms':>11} {'array MB':>9} {'mapped A* ms':>12} {'mapped MB':>10}  same")
+    for size in args.sizes:
+        image = synthetic_map_image(size, args.seed)
+        image.load()
+        
+        start = time.perf_counter()
+        whole_memory = peak_memory(road_costs, image)
+        whole_time = time.perf_counter() - start
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "map.cost")
+            start = time.perf_counter()
+            tiled_memory = peak_memory(lambda: fill_road_costs(image, open_grid(path, size, size)))
+            tiled_time = time.perf_counter() - start
+            costs = open_grid(path)
+            same = np.array_equal(costs, road_costs(image))
+            start = time.perf_counter()
+            graph_memory = peak_memory(RoadGraph.from_grid, costs)
+            graph_time = time.perf_counter() - start
+            
+            pairs = road_pairs(np.asarray(costs) > 0, args.queries, args.seed)
+            search = GridAStar(costs)
+            start = time.perf_counter()
+            array_paths = [search.find_path(a, b) for a, b in pairs]
+            array_time = time.perf_counter() - start
+            min_cost = search.min_cost
+            search = MappedGridAStar(costs, min_cost, diagonal=False)
+            start = time.perf_counter()
+            mapped_paths = [search.find_path(a, b) for a, b in pairs]
+            mapped_time = time.perf_counter() - start
+            same = same and all((p is None) == (q is None) and (p is None or len(p) == len(q))
+                                for p, q in zip(array_paths, mapped_paths))
+            
+            a, b = max(zip(pairs, array_paths), key=lambda item: len(item[1] or ()))[0]
+            array_memory = peak_memory(lambda: GridAStar(costs).find_path(a, b))
+            mapped_memory = peak_memory(lambda: MappedGridAStar(costs, min_cost, diagonal=False).find_path(a, b))
+            del costs, search
+        n = args.queries
+        print(f"{f'{size}x{size}':>11} {whole_time * 1000:9.0f} {whole_memory / 2 ** 20:9.0f} {tiled_time * 1000:9.0f} "
+              f"{tiled_memory / 2 ** 20:9.1f} {graph_time * 1000:9.0f} {graph_memory / 2 ** 20:9.1f} "
+              f"{array_time / n * 1000:11.1f} {array_memory / 2 ** 20:9.0f} {mapped_time / n * 1000:12.1f} {mapped_memory / 2 ** 20:10.1f}  {same}")
+
+
+def bench_weighted(args):
+    # 4-connected A* against 8-connected octile A* and its any-angle variant on the cost grid of a
+    # noisy two-class map, between points on the same road component
+    print(f"{'size':>11} {'search':>12} {'found':>6} {'ms/query':>9} {'expanded':>9} {'length':>8} {'turns':>6}")
+    for size in args.sizes:
+        costs = road_costs(noisy_map_image(size, args.seed), class_tables(CITY_ROAD_CLASSES))
+        components = RoadComponents.from_grid(costs)
+        rng = random.Random(args.seed)
+        ys, xs = np.nonzero(costs)
+        pairs = []
+        while len(pairs) < args.queries:
+            i, j = rng.randrange(len(xs)), rng.randrange(len(xs))
+            a, b = (int(xs[i]), int(ys[i])), (int(xs[j]), int(ys[j]))
+            if components.label_at(*a) == components.label_at(*b):
+                pairs.append((a, b))
+        
+        searches = [("4-connected", GridAStar(costs)), ("octile", WeightedGridAStar(costs)),
+                    ("any-angle", WeightedGridAStar(costs, any_angle=True))]
+        for name, search in searches:
+            found, expansions, lengths, turns = 0, 0, 0.0, 0
+            start = time.perf_counter()
+            for a, b in pairs:
+                path = search.find_path(a, b)
+                expansions += search.expansions
+                if path is not None:
+                    found += 1
+                    lengths += route_length(path)
+                    turns += route_turns(path)
+            elapsed = time.perf_counter() - start
+            n = len(pairs)
+            print(f"{f'{size}x{size}':>11} {name:>12} {found:>3}/{n:<2} {elapsed / n * 1000:9.1f} {expansions / n:9.0f} "
+                  f"{lengths / max(found, 1):8.1f} {turns / max(found, 1):6.1f}")
+
+
+def bench_cache(args):
+    # Opening a map: hash the file, then build the costs, graph and components (cold) or load them (warm)
+    params = (ROAD_CLASSES, CLOSE_RADIUS)
+    print(f"{'size':>11} {'hash ms':>8} {'cold ms':>8} {'warm ms':>8} {'speed-up':>8} {'cache KB':>9}  same graph")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            image_path = os.path.join(directory, "map.png")
+            synthetic_map_image(size, args.seed).save(image_path)
+            image = Image.open(image_path)
+            cache = MapCache(os.path.join(directory, "cache"))
+            
+            start = time.perf_counter()
+            key = image_key(image_path, params)
+            hash_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            fill = lambda costs: fill_road_costs(image, costs)
+            _, cold_graph, _ = cache.get(image_key(image_path, params), size, size, fill)
+            cold_time = time.perf_counter() - start
+            start = time.perf_counter()
+            warm_costs, warm_graph, _ = cache.get(image_key(image_path, params), size, size, fill)
+            warm_time = time.perf_counter() - start
+            
+            size_kb = sum(os.path.getsize(cache.path(key, suffix))
+                          for suffix in (".cost", ".graph.npz", ".components.npz")) / 1024
+            same = cache.hits == 1 and np.array_equal(warm_costs, road_costs(image)) and \
+                cold_graph.nodes == warm_graph.nodes and len(cold_graph.edges) == len(warm_graph.edges)
+            del warm_costs
+        print(f"{f'{size}x{size}':>11} {hash_time * 1000:8.1f} {cold_time * 1000:8.0f} {warm_time * 1000:8.1f} "
+              f"{cold_time / warm_time:7.1f}x {size_kb:9.0f}  {same}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map routing benchmarks on synthetic road layers")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    jps = commands.add_parser("jps", help="plain A* versus Jump Point Search")
+    jps.add_argument("--sizes", nargs="+", type=int, default=[256, 512, 1024])
+    jps.add_argument("--queries", type=int, default=20)
+    jps.add_argument("--seed", type=int, default=0)
+    jps.set_defaults(run=bench_jps)
+    
+    astar = commands.add_parser("astar", help="map.py's original Node-based A* versus the array-backed one")
+    astar.add_argument("--sizes", nargs="+", type=int, default=[256, 512, 1024, 2048])
+    astar.add_argument("--queries", type=int, default=10)
+    astar.add_argument("--seed", type=int, default=0)
+    astar.set_defaults(run=bench_astar)
+    
+    graph = commands.add_parser("graph", help="cell A* versus routing on the skeleton's junction graph")
+    graph.add_argument("--sizes", nargs="+", type=int, default=[512, 1024, 2048])
+    graph.add_argument("--queries", type=int, default=50)
+    graph.add_argument("--seed", type=int, default=0)
+    graph.set_defaults(run=bench_graph)
+    
+    ch = commands.add_parser("ch", help="road graph A* versus the contraction hierarchy")
+    ch.add_argument("--sizes", nargs="+", type=int, default=[512, 1024, 2048])
+    ch.add_argument("--roads", type=int, default=60)
+    ch.add_argument("--queries", type=int, default=200)
+    ch.add_argument("--seed", type=int, default=0)
+    ch.set_defaults(run=bench_hierarchy)
+    
+    cache = commands.add_parser("cache", help="building a map's mask and road graph versus loading them from the cache")
+    cache.add_argument("--sizes", nargs="+", type=int, default=[1024, 2048, 4096])
+    cache.add_argument("--seed", type=int, default=0)
+    cache.set_defaults(run=bench_cache)
+    
+    segment = commands.add_parser("segment", help="yellow threshold versus road classes with closing, on a noisy map")
+    segment.add_argument("--sizes", nargs="+", type=int, default=[1024, 2048])
+    segment.add_argument("--seed", type=int, default=0)
+    segment.set_defaults(run=bench_segment)
+    
+    tiles = commands.add_parser("tiles", help="whole-image versus banded road costs, array versus memory-mapped A*")
+    tiles.add_argument("--sizes", nargs="+", type=int, default=[2048, 4096, 8192])
+    tiles.add_argument("--queries", type=int, default=5)
+    tiles.add_argument("--seed", type=int, default=0)
+    tiles.set_defaults(run=bench_tiles)
+    
+    weighted = commands.add_parser("weighted", help="4-connected versus octile and any-angle A* on a cost grid")
+    weighted.add_argument("--sizes", nargs="+", type=int, default=[512, 1024, 2048])
+    weighted.add_argument("--queries", type=int, default=20)
+    weighted.add_argument("--seed", type=int, default=0)
+    weighted.set_defaults(run=bench_weighted)
+    
+    multi = commands.add_parser("multi", help="bidirectional A*, one-to-many sweeps and multi-stop tours")
+    multi.add_argument("--sizes", nargs="+", type=int, default=[512, 1024, 2048])
+    multi.add_argument("--roads", type=int, default=60)
+    multi.add_argument("--queries", type=int, default=200)
+    multi.add_argument("--goals", type=int, default=50)
+    multi.add_argument("--stops", type=int, default=8)
+    multi.add_argument("--seed", type=int, default=0)
+    multi.set_defaults(run=bench_multi)
+    
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
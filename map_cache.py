@@ -0,0 +1,155 @@
+import hashlib
+import os
+import struct
+import numpy as np
+
+from road_graph import RoadGraph
+from segmentation import RoadComponents
+
+# Per-image preprocessing results on disk, addressed by a hash of the image file's bytes and of the
+# parameters that turned it into road costs. Each entry is a few files sharing the key as a prefix:
+#   <key>.cost           header + the travel cost of every pixel, one byte each, 0 off the roads
+#                        (memory-mapped, never read as a whole unless something needs it)
+#   <key>.graph.npz      the skeleton's junction graph
+#   <key>.components.npz the roads' connected components
+#   <key>.ch.npz         the contraction hierarchy, once built
+MAGIC = b"MAP3"
+HEADER = struct.Struct("<4sII")  # magic, width, height
+FORMAT_VERSION = 3  # Part of every key: bump when the cost grid or graph construction changes
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-mini-games", "maps")
+
+
+def image_key(path, params):
+    """Hex digest of the file at path together with the road parameters"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((FORMAT_VERSION, params)).encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def open_grid(path, width=None, height=None):
+    # Memory map of a cost grid file: read-only for an existing file, or a new zeroed file of the
+    # given size opened for writing
+    if width is not None:
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, width, height))
+        return np.memmap(path, dtype=np.uint8, mode="r+", offset=HEADER.size, shape=(height, width))
+    with open(path, "rb") as f:
+        magic, width, height = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("not a cost grid file")
+    return np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(height, width))
+
+
+def discard(path):
+    # Remove a file if it is there, ignoring failures
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MapCache:
+    """Road cost grids, road graphs and components of previously opened maps, bounded by
+    least-recent use"""
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_entries=32):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+    
+    def path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+    
+    def load(self, key):
+        # (costs, graph, components) for a cached image, or None when not cached (or unreadable)
+        path = self.path(key, ".cost")
+        try:
+            costs = open_grid(path)
+            graph = RoadGraph.load(self.path(key, ".graph.npz"))
+            components = RoadComponents.load(self.path(key, ".components.npz"))
+            if graph is None or components is None:
+                return None
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, struct.error):
+            return None
+        return costs, graph, components
+    
+    def get(self, key, width, height, fill_costs):
+        """(costs, graph, components) for this key. On a miss fill_costs(costs) writes the cost grid
+        into a memory-mapped file, and the graph and components are built from it band by band
+        (neither holds more than a band of the grid, plus the skeleton); all are stored."""
+        cached = self.load(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        
+        grid_path = self.path(key, ".cost")
+        temp = f"{grid_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            costs = open_grid(temp, width, height)
+        except OSError:
+            discard(temp)
+            temp = None  # An unwritable cache only costs the rebuild next time
+            costs = np.zeros((height, width), dtype=np.uint8)
+        try:
+            fill_costs(costs)
+            graph = RoadGraph.from_grid(costs)
+            components = RoadComponents.from_grid(costs)
+        except Exception:
+            if temp is not None:
+                del costs  # Close the memory map before removing its file
+                discard(temp)
+            raise
+        if temp is None:
+            return costs, graph, components
+        
+        # The cost grid goes last: load only trusts entries whose grid exists. Its memory map is
+        # closed before the rename and the renamed file opened read-only, as load would
+        costs.flush()
+        del costs
+        saved_temp = temp
+        try:
+            for suffix, saved in ((".graph.npz", graph), (".components.npz", components)):
+                path = self.path(key, suffix)
+                saved_temp = f"{path}.{os.getpid()}.tmp.npz"
+                saved.save(saved_temp)
+                os.replace(saved_temp, path)
+            os.replace(temp, grid_path)
+        except OSError:
+            costs = np.array(open_grid(temp))  # Kept in memory; the entry is rebuilt next time
+            discard(saved_temp)
+            discard(temp)
+            return costs, graph, components
+        self.evict()
+        return open_grid(grid_path), graph, components
+    
+    def evict(self):
+        # Drop the least recently used entries (all of their files) beyond max_entries
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        keys = [name[:-len(".cost")] for name in names if name.endswith(".cost")]
+        if len(keys) <= self.max_entries:
+            return
+        
+        def last_used(key):
+            try:
+                return os.path.getmtime(self.path(key, ".cost"))
+            except OSError:
+                return 0
+        
+        keys.sort(key=last_used)
+        stale = set(keys[:len(keys) - self.max_entries])
+        for name in names:
+            if name.split(".", 1)[0] in stale:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,70 @@
+import math
+
+# Visiting order for multi-stop routes on a RoadGraph (a travelling-salesman problem, solved
+# heuristically). Road distances between all stops come from one Dijkstra sweep per stop; the order
+# starts as nearest-neighbour and is then improved with 2-opt moves (reversing a stretch of the
+# tour) until none shortens it.
+
+
+def tour_length(order, distances, closed=False):
+    length = sum(distances[a][b] for a, b in zip(order, order[1:]))
+    return length + distances[order[-1]][order[0]] if closed else length
+
+
+def nearest_neighbour_order(distances):
+    # Greedy order from stop 0: always go to the closest stop not yet visited
+    order = [0]
+    remaining = set(range(1, len(distances)))
+    while remaining:
+        last = distances[order[-1]]
+        nearest = min(remaining, key=lambda stop: last[stop])
+        order.append(nearest)
+        remaining.remove(nearest)
+    return order
+
+
+def two_opt(order, distances, closed=False):
+    """Improve an order (stop 0 stays first) by segment reversals until none shortens it"""
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(order) - 1):
+            for j in range(i + 1, len(order)):
+                a, b, c = order[i - 1], order[i], order[j]
+                d = order[j + 1] if j + 1 < len(order) else (order[0] if closed else None)
+                before = distances[a][b] + (distances[c][d] if d is not None else 0)
+                after = distances[a][c] + (distances[b][d] if d is not None else 0)
+                if after < before - 1e-9:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    improved = True
+    return order
+
+
+def plan_tour(graph, start, stops, return_to_start=False):
+    """Visit all stops from start along the roads in a short order.
+    
+    Returns (order, route): order lists indices into stops in visiting order, route is the whole
+    journey as (x, y) pixels. None if a point is off the roads or a stop cannot be reached.
+    """
+    locations = [graph.snap(point) for point in [start] + list(stops)]
+    if any(location is None for location in locations):
+        return None
+    sweeps = [graph.sweep(location, locations) for location in locations]
+    distances = [[cost for cost, _ in results] for results, _ in sweeps]
+    if any(math.isinf(cost) for cost in distances[0]):
+        return None
+    
+    order = two_opt(nearest_neighbour_order(distances), distances, return_to_start)
+    if return_to_start:
+        order.append(0)
+    route = []
+    for a, b in zip(order, order[1:]):
+        if locations[a] == locations[b]:
+            continue
+        results, parent = sweeps[a]
+        leg = graph.tree_route(locations[a], locations[b], results[b][1], parent)
+        route += leg[1:] if route and route[-1] == leg[0] else leg
+    if not route:
+        route = [graph.location_xy(locations[0])]
+    return [stop - 1 for stop in order[1:] if stop], route
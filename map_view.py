@@ -0,0 +1,169 @@
+import math
+import tkinter as tk
+from collections import OrderedDict
+from PIL import Image, ImageTk
+
+# Zoomable map display for map.py. Zoom levels are powers of two (2 ** zoom screen pixels per image
+# pixel); zooming out uses a pyramid of pre-shrunk copies of the image, zooming in enlarges tiles of
+# the full image. Only tiles overlapping the canvas exist as canvas items, and their PhotoImages are
+# kept in a bounded cache, so memory does not grow with the map or with the number of redraws.
+
+TILE_SIZE = 256  # Screen pixels per tile side
+MAX_ZOOM_IN = 3  # Up to 8 screen pixels per image pixel
+TILE_CACHE_SIZE = 256  # PhotoImages kept for reuse (a full-HD canvas shows about 50)
+
+
+class TilePyramid:
+    """The image at halving resolutions (level n is 2 ** n times smaller), cut into tiles on demand"""
+    def __init__(self, image):
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGB")
+        self.levels = [image]
+        while max(self.levels[-1].size) > TILE_SIZE:
+            self.levels.append(self.levels[-1].reduce(2))
+        self.photos = OrderedDict()
+    
+    def size(self, zoom):
+        # Size of the whole image on screen at this zoom
+        width, height = self.levels[max(-zoom, 0)].size
+        return width << max(zoom, 0), height << max(zoom, 0)
+    
+    def photo(self, zoom, column, row):
+        key = (zoom, column, row)
+        photo = self.photos.get(key)
+        if photo is not None:
+            self.photos.move_to_end(key)
+            return photo
+        level = self.levels[max(-zoom, 0)]
+        span = TILE_SIZE >> max(zoom, 0)  # Level pixels per tile side
+        left, top = column * span, row * span
+        tile = level.crop((left, top, min(left + span, level.width), min(top + span, level.height)))
+        if zoom > 0:
+            tile = tile.resize((tile.width << zoom, tile.height << zoom), Image.NEAREST)
+        photo = ImageTk.PhotoImage(tile)
+        self.photos[key] = photo
+        return photo
+    
+    def trim(self, keep):
+        # Forget the least recently used tiles beyond TILE_CACHE_SIZE, never those still shown
+        for key in list(self.photos):
+            if len(self.photos) <= TILE_CACHE_SIZE:
+                break
+            if key not in keep:
+                del self.photos[key]
+
+
+class MapViewport:
+    """Pan and zoom state of a map on a canvas. Points and routes are given in image coordinates and
+    drawn as canvas items on top of the tiles."""
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.pyramid = None
+        self.zoom = 0
+        self.origin = (0.0, 0.0)  # Canvas position of the image's top-left corner
+        self.tile_items = {}
+        self.overlay = ((), None)
+        self.drag_start = None
+        
+        canvas.bind("<Configure>", lambda event: self.render())
+        canvas.bind("<MouseWheel>", lambda event: self.zoom_at(event.x, event.y, 1 if event.delta > 0 else -1))
+        canvas.bind("<Button-4>", lambda event: self.zoom_at(event.x, event.y, 1))
+        canvas.bind("<Button-5>", lambda event: self.zoom_at(event.x, event.y, -1))
+        for button in (2, 3):
+            canvas.bind(f"<ButtonPress-{button}>", self.start_drag)
+            canvas.bind(f"<B{button}-Motion>", self.drag)
+    
+    def show(self, image):
+        """Display a new image, zoomed out until it fits the canvas"""
+        self.canvas.delete("tile")
+        self.tile_items = {}
+        self.pyramid = TilePyramid(image)
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        self.zoom = 0
+        if width > 1 and height > 1:
+            while self.zoom > 1 - len(self.pyramid.levels) and (image.width * self.scale > width or
+                                                                 image.height * self.scale > height):
+                self.zoom -= 1
+        self.origin = (0.0, 0.0)
+        self.render()
+    
+    @property
+    def scale(self):
+        return 2.0 ** self.zoom
+    
+    def to_image(self, x, y):
+        """Image pixel under a canvas position, or None outside the image"""
+        if self.pyramid is None:
+            return None
+        ix = math.floor((x - self.origin[0]) / self.scale)
+        iy = math.floor((y - self.origin[1]) / self.scale)
+        width, height = self.pyramid.levels[0].size
+        return (ix, iy) if 0 <= ix < width and 0 <= iy < height else None
+    
+    def to_canvas(self, x, y):
+        # Centre of image pixel (x, y) on the canvas
+        return self.origin[0] + (x + 0.5) * self.scale, self.origin[1] + (y + 0.5) * self.scale
+    
+    def zoom_at(self, x, y, step):
+        # Zoom in (step 1) or out (step -1) keeping the image point under (x, y) in place
+        if self.pyramid is None:
+            return
+        zoom = min(max(self.zoom + step, 1 - len(self.pyramid.levels)), MAX_ZOOM_IN)
+        factor = 2.0 ** (zoom - self.zoom)
+        self.zoom = zoom
+        self.origin = (x - (x - self.origin[0]) * factor, y - (y - self.origin[1]) * factor)
+        self.render()
+    
+    def start_drag(self, event):
+        self.drag_start = (event.x, event.y)
+    
+    def drag(self, event):
+        if self.drag_start is None:
+            return
+        dx, dy = event.x - self.drag_start[0], event.y - self.drag_start[1]
+        self.drag_start = (event.x, event.y)
+        self.origin = (self.origin[0] + dx, self.origin[1] + dy)
+        self.render()
+    
+    def set_overlay(self, points, route):
+        """Markers as (x, y, colour) and a route as a list of (x, y), in image coordinates"""
+        self.overlay = (points, route)
+        self.draw_overlay()
+    
+    def render(self):
+        if self.pyramid is None:
+            return
+        canvas, zoom = self.canvas, self.zoom
+        ox, oy = round(self.origin[0]), round(self.origin[1])
+        width, height = self.pyramid.size(zoom)
+        columns, rows = math.ceil(width / TILE_SIZE), math.ceil(height / TILE_SIZE)
+        view_width, view_height = canvas.winfo_width(), canvas.winfo_height()
+        first_column, first_row = max(-ox // TILE_SIZE, 0), max(-oy // TILE_SIZE, 0)
+        last_column = min((view_width - ox) // TILE_SIZE, columns - 1)
+        last_row = min((view_height - oy) // TILE_SIZE, rows - 1)
+        visible = {(zoom, column, row) for column in range(first_column, last_column + 1)
+                   for row in range(first_row, last_row + 1)}
+        
+        for key in [key for key in self.tile_items if key not in visible]:
+            canvas.delete(self.tile_items.pop(key))
+        for key in visible:
+            _, column, row = key
+            x, y = ox + column * TILE_SIZE, oy + row * TILE_SIZE
+            item = self.tile_items.get(key)
+            if item is None:
+                self.tile_items[key] = canvas.create_image(x, y, anchor=tk.NW, image=self.pyramid.photo(*key),
+                                                           tags="tile")
+            else:
+                canvas.coords(item, x, y)
+        self.pyramid.trim(visible)
+        self.draw_overlay()
+    
+    def draw_overlay(self):
+        self.canvas.delete("overlay")
+        points, route = self.overlay
+        if route and len(route) > 1:
+            coords = [value for point in route for value in self.to_canvas(*point)]
+            self.canvas.create_line(coords, fill="blue", width=3, tags="overlay")
+        for x, y, colour in points:
+            cx, cy = self.to_canvas(x, y)
+            self.canvas.create_oval(cx - 5, cy - 5, cx + 5, cy + 5, fill=colour, outline="white", tags="overlay")
@@ -1,11 +1,42 @@
 import tkinter as tk
+import base64
 import random
-import heapq
+import struct
+import zlib
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox, ttk
+from maze_grid import MazeGrid
+from maze_sim import DIFFICULTY_SETTINGS, MOVES
+from maze_cache import MazeCache
+
+# Games generated ahead (in the background) for each level, so starting one only loads a cached file
+PRECOMPUTED_GAMES = 3
+
+
+def hex_to_rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def png_data(pixels):
+    # Encode an (h, w, 3) uint8 array as base64 PNG, the format tk.PhotoImage reliably accepts as data
+    height, width, _ = pixels.shape
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # Filter byte 0 before every row
+    raw[:, 1:] = pixels.reshape(height, width * 3)
+    
+    def chunk(tag, body):
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+    
+    png = (b"\x89PNG\r\n\x1a\n"
+           + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+           + chunk(b"IDAT", zlib.compress(raw.tobytes()))
+           + chunk(b"IEND", b""))
+    return base64.b64encode(png).decode("ascii")
 
 
 class MazeGame:
-    DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Down, Right, Up, Left
+    DIRECTIONS = MazeGrid.DIRECTIONS
     
     def __init__(self, root):
         self.root = root
@@ -18,11 +49,7 @@ class MazeGame:
         
         # Game settings
         self.cell_size = 30
-        self.difficulty_settings = {
-            "Easy": {"size": 15, "ai_speed": 1, "opening_factor": 0.1, "optimal_move_chance": 0.7},
-            "Medium": {"size": 21, "ai_speed": 2, "opening_factor": 0.05, "optimal_move_chance": 0.9},
-            "Hard": {"size": None, "ai_speed": 3, "opening_factor": 0.01, "optimal_move_chance": 1.0}
-        }
+        self.difficulty_settings = DIFFICULTY_SETTINGS
         
         # Colors
         self.colors = {
@@ -33,18 +60,26 @@ class MazeGame:
             "exit": "#0000FF"
         }
         
-        # Game state
+        # Game state (positions, moves and the AI live in the headless simulation)
+        self.sim = None
         self.maze = None
-        self.player_pos = None
-        self.ai_pos = None
-        self.exit_pos = None
+        
+        # Seeded layouts on disk, plus the seeds already generated for each (level, size)
+        self.cache = MazeCache()
+        self.ready_seeds = {}
+        self.pending_levels = set()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.game_active = False
-        self.move_count = 0
         self.current_settings = None
         self.difficulty_var = tk.StringVar(value="Easy")
         
         # Set up the UI
         self.setup_ui()
+        
+        # Precompute games for every level at this screen size
+        for level in self.difficulty_settings:
+            self.refill_seeds(level, self.level_size(level)[1])
     
     def setup_ui(self):
         # Control panel
@@ -75,6 +110,10 @@ class MazeGame:
         restart_button = tk.Button(control_frame, text="Restart", command=self.start_game)
         restart_button.pack(side=tk.LEFT, padx=20)
         
+        # Replay button (same seed: same maze and starting positions)
+        replay_button = tk.Button(control_frame, text="Replay", command=self.replay_game)
+        replay_button.pack(side=tk.LEFT)
+        
         # Game stats
         self.stats_label = tk.Label(self.root, text="Moves: 0 | Level: Easy")
         self.stats_label.pack(pady=5)
@@ -112,301 +151,145 @@ class MazeGame:
         # Bind keyboard events
         self.root.bind("<KeyPress>", self.handle_keypress)
     
-    def start_game(self):
+    def level_size(self, difficulty):
+        # Returns (cell_size, maze size) for a level
+        size = self.difficulty_settings[difficulty]["size"]
+        if size is not None:
+            return 30, size
+        
+        # Calculate maze size based on screen dimensions, with smaller cells to fit the screen
+        cell_size = 20
+        max_width = self.screen_width // cell_size
+        max_height = (self.screen_height - 100) // cell_size  # Leave room for controls
+        size = min(max_width, max_height)
+        
+        # Make sure size is odd for maze generation
+        if size % 2 == 0:
+            size -= 1
+        return cell_size, size
+    
+    def start_game(self, seed=None):
         # Get current difficulty settings
         difficulty = self.difficulty_var.get()
         self.current_settings = self.difficulty_settings[difficulty]
         
         # Set size based on difficulty
-        if difficulty == "Hard":
-            # Calculate maze size based on screen dimensions
-            # Adjust cell size for Hard mode to fit screen
-            self.cell_size = min(20, self.cell_size)  # Smaller cells for Hard mode
-            max_width = self.screen_width // self.cell_size
-            max_height = (self.screen_height - 100) // self.cell_size  # Leave room for controls
-            size = min(max_width, max_height)
-            
-            # Make sure size is odd for maze generation
-            if size % 2 == 0:
-                size -= 1
-                
-            # Set window to maximize (Hard mode only)
+        self.cell_size, size = self.level_size(difficulty)
+        if self.current_settings["size"] is None:
+            # Set window to maximize (screen-sized levels only)
             self.root.state('zoomed')
         else:
             # Normal window for Easy/Medium
-            self.cell_size = 30  # Reset cell size for other modes
-            size = self.current_settings["size"]
             self.root.state('normal')
             self.root.resizable(False, False)
         
         # Create UI elements
         self.create_canvas(size, size)
         
-        # Generate maze and entities
-        self.maze = self.generate_maze(size, size)
-        self.place_entities(size)
+        # Take a precomputed seed when there is one; a new seed is generated (and cached) on the spot
+        if seed is None:
+            seeds = self.ready_seeds.get((difficulty, size))
+            seed = seeds.popleft() if seeds else random.randrange(2 ** 32)
+        self.sim = self.cache.get(difficulty, size, seed)
+        self.maze = self.sim.maze
+        self.refill_seeds(difficulty, size)
         
         # Reset game state
         self.game_active = True
-        self.move_count = 0
         
         # Draw the maze
         self.draw_maze()
         self.update_stats()
     
-    def generate_maze(self, width, height):
-        # Initialize maze with walls
-        maze = [['#' for _ in range(width)] for _ in range(height)]
-        
-        def carve_passages(x, y, visited=None):
-            if visited is None:
-                visited = set()
-                
-            maze[y][x] = ' '
-            visited.add((x, y))
-            
-            # Randomize directions
-            directions = list(self.DIRECTIONS)
-            random.shuffle(directions)
-            
-            for dx, dy in directions:
-                nx, ny = x + 2*dx, y + 2*dy
-                
-                if (0 <= nx < width and 0 <= ny < height and (nx, ny) not in visited):
-                    # Carve passage
-                    maze[y + dy][x + dx] = ' '
-                    carve_passages(nx, ny, visited)
-        
-        # Start from a random position
-        start_x = random.randrange(1, width, 2)
-        start_y = random.randrange(1, height, 2)
-        
-        # Adjust if out of bounds
-        if start_x >= width: start_x = width - 2
-        if start_y >= height: start_y = height - 2
-        
-        # Generate the maze
-        carve_passages(start_x, start_y)
-        
-        # Add random openings based on difficulty
-        opening_factor = self.current_settings["opening_factor"]
-        
-        for y in range(1, height-1):
-            for x in range(1, width-1):
-                if maze[y][x] == '#' and random.random() < opening_factor:
-                    # Prevent 2x2 open areas
-                    if not all(maze[y+dy][x+dx] == ' ' for dx, dy in [(0,0), (1,0), (0,1), (1,1)]):
-                        maze[y][x] = ' '
-        
-        return maze
+    def replay_game(self):
+        if self.sim is not None:
+            self.start_game(self.sim.seed)
+    
+    def refill_seeds(self, difficulty, size):
+        # Top the level's seed queue back up in the background (one batch in flight per level)
+        key = (difficulty, size)
+        seeds = self.ready_seeds.setdefault(key, deque())
+        missing = PRECOMPUTED_GAMES - len(seeds)
+        if missing <= 0 or key in self.pending_levels:
+            return
+        
+        self.pending_levels.add(key)
+        future = self.executor.submit(self.cache.precompute, difficulty, size, missing)
+        
+        def done(future):
+            self.pending_levels.discard(key)
+            if not future.cancelled() and future.exception() is None:
+                seeds.extend(future.result())
+        future.add_done_callback(done)
+    
+    @property
+    def player_pos(self):
+        return self.sim.player_pos
+    
+    @property
+    def ai_positions(self):
+        return self.sim.ai_positions
+    
+    @property
+    def exit_pos(self):
+        return self.sim.exit_pos
     
-    def place_entities(self, size):
-        # Find all empty cells
-        empty_cells = []
-        for y in range(size):
-            for x in range(size):
-                if self.maze[y][x] == ' ':
-                    empty_cells.append((x, y))
-        
-        if not empty_cells:
-            return  # No empty cells (shouldn't happen)
-        
-        # Place player in top-left area
-        top_left = [(x, y) for x, y in empty_cells if x < size//2 and y < size//2]
-        self.player_pos = random.choice(top_left if top_left else empty_cells)
-        
-        # Place exit in bottom-right area
-        bottom_right = [(x, y) for x, y in empty_cells 
-                       if x >= size//2 and y >= size//2 and (x, y) != self.player_pos]
-        self.exit_pos = random.choice(bottom_right if bottom_right else 
-                                     [pos for pos in empty_cells if pos != self.player_pos])
-        
-        # Place AI far from player
-        available = [(x, y) for x, y in empty_cells 
-                    if (x, y) != self.player_pos and (x, y) != self.exit_pos]
-        
-        # Sort by distance (descending)
-        available.sort(key=lambda pos: -self.manhattan_distance(pos, self.player_pos))
-        
-        # Choose one of the farthest positions
-        far_positions = available[:max(1, len(available) // 10)]
-        self.ai_pos = random.choice(far_positions)
+    @property
+    def move_count(self):
+        return self.sim.move_count
     
     def draw_maze(self):
+        # Render the static maze once as a single image, then create the entity items (one per chaser)
         self.canvas.delete("all")
         
-        size = len(self.maze)
-        
-        # Draw maze cells
-        for y in range(size):
-            for x in range(size):
-                x1, y1 = x * self.cell_size, y * self.cell_size
-                x2, y2 = x1 + self.cell_size, y1 + self.cell_size
-                
-                if self.maze[y][x] == '#':
-                    self.canvas.create_rectangle(x1, y1, x2, y2, fill=self.colors["wall"], outline="")
-                else:
-                    self.canvas.create_rectangle(x1, y1, x2, y2, fill=self.colors["path"], outline="")
-        
-        # Draw exit
-        ex, ey = self.exit_pos
-        self.draw_entity(ex, ey, self.colors["exit"], "rectangle")
-        
-        # Draw AI
-        ax, ay = self.ai_pos
-        self.draw_entity(ax, ay, self.colors["ai"], "oval")
-        
-        # Draw player
-        px, py = self.player_pos
-        self.draw_entity(px, py, self.colors["player"], "oval")
+        palette = np.array([hex_to_rgb(self.colors["path"]), hex_to_rgb(self.colors["wall"])], dtype=np.uint8)
+        pixels = palette[self.maze.cells]  # One pixel per cell; Tk scales it up
+        self.maze_image = tk.PhotoImage(data=png_data(pixels)).zoom(self.cell_size)
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.maze_image)
+        
+        self.entity_items = {
+            "exit": self.draw_entity(*self.exit_pos, self.colors["exit"], "rectangle"),
+            "player": self.draw_entity(*self.player_pos, self.colors["player"], "oval")
+        }
+        self.ai_items = [self.draw_entity(*pos, self.colors["ai"], "oval") for pos in self.ai_positions]
+    
+    def update_entities(self):
+        # Per-move redraw: only the entity items move, whatever the maze size
+        items = [(self.entity_items["exit"], self.exit_pos), (self.entity_items["player"], self.player_pos)]
+        items += zip(self.ai_items, self.ai_positions)
+        for item, (x, y) in items:
+            x1, y1 = x * self.cell_size, y * self.cell_size
+            self.canvas.coords(item, x1, y1, x1 + self.cell_size, y1 + self.cell_size)
     
     def draw_entity(self, x, y, color, shape):
         x1, y1 = x * self.cell_size, y * self.cell_size
         x2, y2 = x1 + self.cell_size, y1 + self.cell_size
         
         if shape == "rectangle":
-            self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="")
+            return self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="")
         else:  # "oval"
-            self.canvas.create_oval(x1, y1, x2, y2, fill=color, outline="")
+            return self.canvas.create_oval(x1, y1, x2, y2, fill=color, outline="")
     
     def update_stats(self):
-        self.stats_label.config(text=f"Moves: {self.move_count} | Level: {self.difficulty_var.get()}")
+        self.stats_label.config(
+            text=f"Moves: {self.move_count} | Level: {self.difficulty_var.get()} | Seed: {self.sim.seed}")
     
     def handle_keypress(self, event):
         if not self.game_active:
             return
         
-        px, py = self.player_pos
-        new_px, new_py = px, py
-        
         # Process arrow key input
-        if event.keysym == 'Up':
-            new_py -= 1
-        elif event.keysym == 'Down':
-            new_py += 1
-        elif event.keysym == 'Left':
-            new_px -= 1
-        elif event.keysym == 'Right':
-            new_px += 1
-        else:
+        if event.keysym not in MOVES:
             return  # Not a movement key
         
-        # Validate move
-        if self.is_valid_move(new_px, new_py):
-            # If the AI is already at the new position, the player loses immediately
-            if (new_px, new_py) == self.ai_pos:
-                self.player_pos = (new_px, new_py)  # Move player to AI position (for visual feedback)
-                self.move_count += 1
-                self.game_active = False
-                self.draw_maze()
-                self.update_stats()
-                self.show_game_result(False)
-                return
-                
-            self.player_pos = (new_px, new_py)
-            self.move_count += 1
-            
-            # Check win condition
-            if self.player_pos == self.exit_pos:
-                self.game_active = False
-                self.draw_maze()
-                self.update_stats()
-                self.show_game_result(True)
-                return
-            
-            # Move AI
-            for _ in range(self.current_settings["ai_speed"]):
-                if self.game_active:
-                    self.move_ai()
-                    
-                    # Check if AI caught player
-                    if self.ai_pos == self.player_pos:
-                        self.game_active = False
-                        self.draw_maze()
-                        self.update_stats()
-                        self.show_game_result(False)
-                        return
-            
-            # Update display
-            self.draw_maze()
+        # Validate and play the move; the simulation moves the AI in response
+        if self.sim.step(*MOVES[event.keysym]):
+            self.update_entities()
             self.update_stats()
-    
-    def is_valid_move(self, x, y):
-        size = len(self.maze)
-        return (0 <= x < size and 0 <= y < size and self.maze[y][x] != '#')
-    
-    def move_ai(self):
-        difficulty = self.difficulty_var.get()
-        
-        if difficulty == "Hard":
-            # Use A* pathfinding
-            path = self.a_star_search(self.ai_pos, self.player_pos)
-            if path and len(path) > 1:
-                self.ai_pos = path[1]  # Next step in path
-        else:
-            # Simpler pathfinding for Easy/Medium
-            ax, ay = self.ai_pos
-            possible_moves = []
-            
-            # Get all valid moves
-            for dx, dy in self.DIRECTIONS:
-                nx, ny = ax + dx, ay + dy
-                if self.is_valid_move(nx, ny):
-                    possible_moves.append((nx, ny))
             
-            if possible_moves:
-                # Choose move based on difficulty
-                optimal_chance = self.current_settings["optimal_move_chance"]
-                
-                if random.random() < optimal_chance:
-                    # Sort by distance to player (ascending)
-                    possible_moves.sort(key=lambda pos: self.manhattan_distance(pos, self.player_pos))
-                    self.ai_pos = possible_moves[0]  # Best move
-                else:
-                    # Random move
-                    self.ai_pos = random.choice(possible_moves)
-    
-    def a_star_search(self, start, goal):
-        # A* search algorithm with priority queue
-        frontier = [(0, start)]  # (priority, position)
-        came_from = {start: None}
-        cost_so_far = {start: 0}
-        
-        while frontier:
-            _, current = heapq.heappop(frontier)
-            
-            if current == goal:
-                break
-                
-            cx, cy = current
-            for dx, dy in self.DIRECTIONS:
-                next_pos = (cx + dx, cy + dy)
-                nx, ny = next_pos
-                
-                if self.is_valid_move(nx, ny):
-                    new_cost = cost_so_far[current] + 1
-                    
-                    if next_pos not in cost_so_far or new_cost < cost_so_far[next_pos]:
-                        cost_so_far[next_pos] = new_cost
-                        priority = new_cost + self.manhattan_distance(next_pos, goal)
-                        heapq.heappush(frontier, (priority, next_pos))
-                        came_from[next_pos] = current
-        
-        # Reconstruct path
-        if goal not in came_from:
-            return None
-            
-        path = [goal]
-        current = goal
-        while current != start:
-            current = came_from[current]
-            path.append(current)
-        path.reverse()
-        
-        return path
-    
-    def manhattan_distance(self, a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+            if not self.sim.running:
+                self.game_active = False
+                self.show_game_result(self.sim.status == "escaped")
     
     def show_game_result(self, won):
         if won:
@@ -419,6 +302,10 @@ class MazeGame:
         result = messagebox.askquestion(title, message + "\nDo you want to play again?")
         if result == 'yes':
             self.start_game()
+    
+    def on_close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from maze_generation import GENERATORS
+from maze_chunks import ChunkedMaze
+from maze_planner import CorridorGraph, a_star_search
+from grid_search import JumpPointSearch
+from maze_sim import DIFFICULTY_SETTINGS, PLAYER_POLICIES, MazeSimulation, play_game
+from maze_cache import MazeCache
+
+
+def is_perfect(grid):
+    # A perfect maze is a tree: connected, with exactly (open cells - 1) open adjacencies
+    open_cells = grid.walkable_mask()
+    edges = (np.count_nonzero(open_cells[:, 1:] & open_cells[:, :-1])
+             + np.count_nonzero(open_cells[1:, :] & open_cells[:-1, :]))
+    cells = grid.walkable_cells()
+    if edges != len(cells) - 1:
+        return False
+    
+    seen = {cells[0]}
+    stack = [cells[0]]
+    while stack:
+        for nxt in grid.neighbors(*stack.pop()):
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return len(seen) == len(cells)
+
+
+def bench_generation(args):
+    print(f"{'algorithm':12} {'size':>10} {'best ms':>10} {'mean ms':>10}  perfect")
+    for algorithm in args.algorithms:
+        for size in args.sizes:
+            times = []
+            for run in range(args.repeat):
+                rng = random.Random(args.seed + run)
+                start = time.perf_counter()
+                grid = GENERATORS[algorithm](size, size, rng)
+                times.append(time.perf_counter() - start)
+            perfect = is_perfect(grid) if args.check else "-"
+            print(f"{algorithm:12} {f'{size}x{size}':>10} {min(times) * 1000:10.1f} "
+                  f"{sum(times) / len(times) * 1000:10.1f}  {perfect}")
+
+
+def bench_chunks(args):
+    # Wall-following explorer through an unbounded chunked maze: startup cost, chunk churn and memory
+    maze = ChunkedMaze(args.seed, chunk_cells=args.chunk_cells, max_chunks=args.max_chunks)
+    pos = (1, 1)
+    
+    start = time.perf_counter()
+    maze.prefetch([pos])
+    startup = time.perf_counter() - start
+    
+    # Right-hand rule: prefer turning right, then straight, left and finally back
+    headings = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+    heading = 0
+    start = time.perf_counter()
+    farthest = 0
+    for _ in range(args.steps):
+        for turn in (1, 0, 3, 2):
+            dx, dy = headings[(heading + turn) % 4]
+            if maze.is_walkable(pos[0] + dx, pos[1] + dy):
+                heading = (heading + turn) % 4
+                pos = (pos[0] + dx, pos[1] + dy)
+                break
+        maze.prefetch([pos])
+        farthest = max(farthest, pos[0] + pos[1])
+    elapsed = time.perf_counter() - start
+    
+    chunk_bytes = maze.chunk_size * maze.chunk_size
+    print(f"startup {startup * 1000:.2f} ms | {args.steps} steps in {elapsed:.2f}s "
+          f"({elapsed / args.steps * 1e6:.1f} us/step)")
+    print(f"farthest x+y reached {farthest} | chunks generated {maze.generated} | "
+          f"resident {len(maze.chunks)} chunks = {len(maze.chunks) * chunk_bytes / 1024:.0f} KiB")
+
+
+class CountingGrid:
+    # Wraps a grid and counts neighbour expansions made by a cell-level search
+    def __init__(self, grid):
+        self.grid = grid
+        self.expansions = 0
+    
+    def neighbors(self, x, y):
+        self.expansions += 1
+        return self.grid.neighbors(x, y)
+
+
+def bench_search(args):
+    print(f"{'size':>10} {'openings':>8} {'graph nodes':>11} {'A* exp':>8} {'graph exp':>9} {'JPS exp':>8} "
+          f"{'A* ms':>8} {'graph ms':>8} {'JPS ms':>8} {'build ms':>8}")
+    for size in args.sizes:
+        for opening in args.openings:
+            rng = random.Random(args.seed)
+            grid = GENERATORS["backtracker"](size, size, rng)
+            grid.add_openings(opening, rng)  # As MazeSimulation.generate_maze does
+            
+            start = time.perf_counter()
+            graph = CorridorGraph(grid)
+            build = time.perf_counter() - start
+            
+            cells = grid.walkable_cells()
+            pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(args.queries)]
+            counting = CountingGrid(grid)
+            start = time.perf_counter()
+            for a, b in pairs:
+                a_star_search(counting, a, b)
+            cell_time = time.perf_counter() - start
+            
+            graph_expansions = 0
+            start = time.perf_counter()
+            for a, b in pairs:
+                graph.find_path(a, b)
+                graph_expansions += graph.expansions
+            graph_time = time.perf_counter() - start
+            
+            jps = JumpPointSearch(grid.walkable_mask())
+            jps_expansions = 0
+            start = time.perf_counter()
+            for a, b in pairs:
+                jps.find_path(a, b)
+                jps_expansions += jps.expansions
+            jps_time = time.perf_counter() - start
+            
+            print(f"{f'{size}x{size}':>10} {opening:8.2f} {len(graph.nodes):11} "
+                  f"{counting.expansions / args.queries:8.0f} {graph_expansions / args.queries:9.0f} "
+                  f"{jps_expansions / args.queries:8.0f} {cell_time / args.queries * 1000:8.3f} "
+                  f"{graph_time / args.queries * 1000:8.3f} {jps_time / args.queries * 1000:8.3f} {build * 1000:8.1f}")
+
+
+def run_games(difficulty, size, policy, seeds):
+    # Worker: play a batch of seeded games and return raw measurements
+    outcomes = {"escaped": 0, "caught": 0, "running": 0}
+    generation, latencies, moves = [], [], []
+    for seed in seeds:
+        sim = play_game(difficulty, size, seed, policy)
+        outcomes[sim.status] += 1
+        generation.append(sim.generation_time)
+        latencies.extend(sim.ai_latencies)
+        moves.append(sim.move_count)
+    return outcomes, generation, latencies, moves
+
+
+def bench_games(args):
+    tasks = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for difficulty in args.levels:
+            size = DIFFICULTY_SETTINGS[difficulty]["size"] or args.hard_size
+            for policy in args.policies:
+                seeds = range(args.seed, args.seed + args.games)
+                batches = [seeds[i:i + args.batch] for i in range(0, len(seeds), args.batch)]
+                futures = [executor.submit(run_games, difficulty, size, policy, batch) for batch in batches]
+                tasks.append((difficulty, size, policy, futures))
+        
+        print(f"{'level':7} {'size':>5} {'player':9} {'caught':>7} {'escaped':>7} {'timeout':>7} {'moves':>6} "
+              f"{'gen ms p50/p95':>15} {'AI us p50/p95/p99':>20}")
+        for difficulty, size, policy, futures in tasks:
+            outcomes = {"escaped": 0, "caught": 0, "running": 0}
+            generation, latencies, moves = [], [], []
+            for future in futures:
+                batch_outcomes, batch_generation, batch_latencies, batch_moves = future.result()
+                for key, count in batch_outcomes.items():
+                    outcomes[key] += count
+                generation.extend(batch_generation)
+                latencies.extend(batch_latencies)
+                moves.extend(batch_moves)
+            
+            gen_ms = np.percentile(generation, [50, 95]) * 1000
+            ai_us = np.percentile(latencies, [50, 95, 99]) * 1e6 if latencies else np.zeros(3)
+            print(f"{difficulty:7} {size:5} {policy:9} {outcomes['caught'] / args.games:7.1%} "
+                  f"{outcomes['escaped'] / args.games:7.1%} {outcomes['running'] / args.games:7.1%} "
+                  f"{np.mean(moves):6.0f} {gen_ms[0]:7.2f}/{gen_ms[1]:<7.2f} "
+                  f"{ai_us[0]:6.0f}/{ai_us[1]:6.0f}/{ai_us[2]:<6.0f}")
+
+
+def bench_cache(args):
+    # Level start from scratch versus from the on-disk cache (a throwaway directory)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = MazeCache(directory, max_entries=len(args.levels) * args.games)
+        print(f"{'level':7} {'size':>5} {'bytes':>6} {'generate ms':>12} {'load ms':>8}")
+        for difficulty in args.levels:
+            size = DIFFICULTY_SETTINGS[difficulty]["size"] or args.hard_size
+            seeds = cache.precompute(difficulty, size, args.games, random.Random(args.seed))
+            
+            start = time.perf_counter()
+            generated = [MazeSimulation(difficulty, size, seed) for seed in seeds]
+            generate_time = (time.perf_counter() - start) / len(seeds)
+            
+            start = time.perf_counter()
+            loaded = [cache.load(difficulty, size, seed) for seed in seeds]
+            load_time = (time.perf_counter() - start) / len(seeds)  # Includes building the chaser
+            
+            for a, b in zip(generated, loaded):
+                assert (a.maze.cells == b.maze.cells).all() and a.ai_positions == b.ai_positions
+            size_bytes = os.path.getsize(cache.path(difficulty, size, seeds[0]))
+            print(f"{difficulty:7} {size:5} {size_bytes:6} {generate_time * 1000:12.2f} {load_time * 1000:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maze benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    generate = commands.add_parser("generate", help="compare maze generation algorithms")
+    generate.add_argument("--algorithms", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    generate.add_argument("--sizes", nargs="+", type=int, default=[51, 201, 1001])
+    generate.add_argument("--repeat", type=int, default=3)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--check", action="store_true", help="verify every result is a perfect maze")
+    generate.set_defaults(run=bench_generation)
+    
+    chunks = commands.add_parser("chunks", help="explore an unbounded chunked maze")
+    chunks.add_argument("--steps", type=int, default=200_000)
+    chunks.add_argument("--chunk-cells", type=int, default=16)
+    chunks.add_argument("--max-chunks", type=int, default=64)
+    chunks.add_argument("--seed", type=int, default=0)
+    chunks.set_defaults(run=bench_chunks)
+    
+    search = commands.add_parser("search", help="cell A* versus the corridor graph and JPS")
+    search.add_argument("--sizes", nargs="+", type=int, default=[49, 101, 201])
+    search.add_argument("--openings", nargs="+", type=float, default=[0.0, 0.01, 0.05])
+    search.add_argument("--queries", type=int, default=200)
+    search.add_argument("--seed", type=int, default=0)
+    search.set_defaults(run=bench_search)
+    
+    games = commands.add_parser("games", help="seeded headless games with scripted players")
+    games.add_argument("--games", type=int, default=1000, help="games per level and player policy")
+    games.add_argument("--levels", nargs="+", default=list(DIFFICULTY_SETTINGS), choices=list(DIFFICULTY_SETTINGS))
+    games.add_argument("--policies", nargs="+", default=list(PLAYER_POLICIES), choices=list(PLAYER_POLICIES))
+    games.add_argument("--hard-size", type=int, default=49, help="maze size for Hard and Crowd (the GUI fits it to the screen)")
+    games.add_argument("--batch", type=int, default=50, help="games per worker task")
+    games.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    games.add_argument("--seed", type=int, default=0)
+    games.set_defaults(run=bench_games)
+    
+    cache = commands.add_parser("cache", help="generated versus cached level starts")
+    cache.add_argument("--games", type=int, default=50, help="layouts per level")
+    cache.add_argument("--levels", nargs="+", default=list(DIFFICULTY_SETTINGS), choices=list(DIFFICULTY_SETTINGS))
+    cache.add_argument("--hard-size", type=int, default=49)
+    cache.add_argument("--seed", type=int, default=0)
+    cache.set_defaults(run=bench_cache)
+    
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
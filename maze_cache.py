@@ -0,0 +1,136 @@
+import hashlib
+import mmap
+import os
+import random
+import struct
+import numpy as np
+
+from maze_grid import MazeGrid
+from maze_sim import DIFFICULTY_SETTINGS, MazeSimulation
+
+# File layout (little-endian): header, one (x, y) pair per chaser, then the cells at one bit each
+MAGIC = b"MAZ1"
+HEADER = struct.Struct("<4sHHQHHHHH")  # magic, width, height, seed, player x/y, exit x/y, chaser count
+POSITION = struct.Struct("<HH")
+FORMAT_VERSION = 1  # Part of every file name: bump when the file layout or maze generation changes
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-mini-games", "mazes")
+
+
+def settings_key(difficulty):
+    """Short hex digest of the format version and the level's settings, so layouts generated under
+    other settings are never served for the same seed"""
+    settings = DIFFICULTY_SETTINGS[difficulty]
+    digest = hashlib.blake2b(repr((FORMAT_VERSION, sorted(settings.items()))).encode(), digest_size=6)
+    return digest.hexdigest()
+
+
+def encode_layout(sim):
+    """Serialise a simulation's maze and starting positions as bytes"""
+    maze = sim.maze
+    header = HEADER.pack(MAGIC, maze.width, maze.height, sim.seed, *sim.player_pos, *sim.exit_pos,
+                         len(sim.ai_positions))
+    chasers = b"".join(POSITION.pack(*pos) for pos in sim.ai_positions)
+    return header + chasers + np.packbits(maze.cells, bitorder="little").tobytes()
+
+
+def decode_layout(buffer):
+    """Inverse of encode_layout; returns (seed, (maze, player_pos, exit_pos, ai_positions))"""
+    magic, width, height, seed, px, py, ex, ey, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("not a maze file")
+    offset = HEADER.size
+    ai_positions = [POSITION.unpack_from(buffer, offset + i * POSITION.size) for i in range(count)]
+    offset += count * POSITION.size
+    
+    cells = width * height
+    packed = np.frombuffer(buffer, dtype=np.uint8, count=(cells + 7) // 8, offset=offset)
+    maze = MazeGrid(width, height)
+    maze.cells[:] = np.unpackbits(packed, count=cells, bitorder="little").reshape(height, width)
+    return seed, (maze, (px, py), (ex, ey), ai_positions)
+
+
+class MazeCache:
+    """Seed-addressed maze layouts on disk, one small file each, bounded by least-recent use"""
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_entries=256):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+    
+    def path(self, difficulty, size, seed):
+        name = f"{difficulty}-{size}-{seed}-v{FORMAT_VERSION}-{settings_key(difficulty)}.maze"
+        return os.path.join(self.directory, name)
+    
+    def load(self, difficulty, size, seed):
+        # Returns None when the layout is not cached (or the file is unreadable)
+        path = self.path(difficulty, size, seed)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                _, layout = decode_layout(buffer)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, struct.error):
+            return None
+        return MazeSimulation(difficulty, size, seed, layout=layout)
+    
+    def store(self, sim):
+        # Returns False when the layout could not be written; an unwritable cache only costs
+        # generating the maze again next time
+        path = self.path(sim.difficulty, sim.size, sim.seed)
+        temp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, "wb") as f:
+                f.write(encode_layout(sim))
+            os.replace(temp, path)  # Readers never see a half-written file
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return False
+        self.evict()
+        return True
+    
+    def get(self, difficulty, size, seed):
+        """Load the game for this seed, generating and storing it on a miss (uncached if the store fails)"""
+        sim = self.load(difficulty, size, seed)
+        if sim is not None:
+            self.hits += 1
+            return sim
+        self.misses += 1
+        sim = MazeSimulation(difficulty, size, seed)
+        self.store(sim)
+        return sim
+    
+    def precompute(self, difficulty, size, count, rng=random):
+        # Generate and store count fresh layouts; returns their seeds. Stops writing (but still returns
+        # the seeds) once the cache turns out to be unwritable
+        seeds = [rng.randrange(2 ** 32) for _ in range(count)]
+        for seed in seeds:
+            if not os.path.exists(self.path(difficulty, size, seed)):
+                if not self.store(MazeSimulation(difficulty, size, seed)):
+                    break
+        return seeds
+    
+    def evict(self):
+        # Drop the least recently used files beyond max_entries
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".maze")]
+        except OSError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        
+        def last_used(name):
+            try:
+                return os.path.getmtime(os.path.join(self.directory, name))
+            except OSError:
+                return 0
+        
+        names.sort(key=last_used)
+        for name in names[:len(names) - self.max_entries]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
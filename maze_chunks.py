@@ -0,0 +1,84 @@
+import random
+from collections import OrderedDict
+from itertools import islice
+
+from maze_grid import MazeGrid, PATH
+from maze_generation import eller_rows
+
+# Unbounded mazes assembled from independently generated chunks. Chunk (cx, cy) covers grid squares
+# [cx*S, (cx+1)*S) x [cy*S, (cy+1)*S) and owns its top and left walls. Its interior is an Eller maze
+# seeded from (seed, cx, cy) alone, and it opens one gap into either its north or its west neighbour
+# (a binary-tree spanning tree over chunks), so the whole world is a single perfect maze that can be
+# regenerated piece by piece from the seed. The world extends without limit to the right and down.
+
+
+class ChunkedMaze:
+    DIRECTIONS = MazeGrid.DIRECTIONS
+    
+    def __init__(self, seed, chunk_cells=16, max_chunks=64):
+        self.seed = seed
+        self.chunk_size = 2 * chunk_cells  # Grid squares per chunk side
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (cx, cy) -> bytearray, least recently used first
+        self.generated = 0           # Total chunk generations, including regenerations after eviction
+    
+    def chunk_rng(self, cx, cy):
+        return random.Random(f"{self.seed}:{cx}:{cy}")
+    
+    def generate_chunk(self, cx, cy):
+        size = self.chunk_size
+        rng = self.chunk_rng(cx, cy)
+        
+        # Stream an Eller maze one row at a time; its bottom and right borders belong to the neighbours
+        data = bytearray()
+        for row in islice(eller_rows(size + 1, size + 1, rng), size):
+            data += row[:size]
+        
+        # Connect to the rest of the world through the north or west wall
+        if cy > 0 and (cx == 0 or rng.random() < 0.5):
+            data[2 * rng.randrange(size // 2) + 1] = PATH
+        elif cx > 0:
+            data[(2 * rng.randrange(size // 2) + 1) * size] = PATH
+        
+        self.generated += 1
+        return data
+    
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        data = self.chunks.get(key)
+        if data is None:
+            data = self.generate_chunk(cx, cy)
+            self.chunks[key] = data
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return data
+    
+    def prefetch(self, positions, radius=1):
+        # Make sure the chunks around each position (e.g. player and AI) are resident
+        for x, y in positions:
+            cx, cy = x // self.chunk_size, y // self.chunk_size
+            for ny in range(max(0, cy - radius), cy + radius + 1):
+                for nx in range(max(0, cx - radius), cx + radius + 1):
+                    self.chunk(nx, ny)
+    
+    def is_walkable(self, x, y):
+        if x < 0 or y < 0:
+            return False
+        size = self.chunk_size
+        cx, lx = divmod(x, size)
+        cy, ly = divmod(y, size)
+        return self.chunk(cx, cy)[ly * size + lx] == PATH
+    
+    def neighbors(self, x, y):
+        return [(x + dx, y + dy) for dx, dy in self.DIRECTIONS if self.is_walkable(x + dx, y + dy)]
+    
+    def window(self, x0, y0, width, height):
+        # Copy a rectangular region into a regular MazeGrid (e.g. for rendering around the player)
+        grid = MazeGrid(width, height)
+        for y in range(height):
+            for x in range(width):
+                if self.is_walkable(x0 + x, y0 + y):
+                    grid.carve(x, y)
+        return grid
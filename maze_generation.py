@@ -0,0 +1,219 @@
+import random
+import numpy as np
+
+from maze_grid import MazeGrid, WALL, PATH
+
+# Perfect-maze generators. All of them work on the "cell lattice" of a MazeGrid: cells sit at odd
+# coordinates (2i+1, 2j+1) and the wall between two neighbouring cells is the grid square halfway
+# between them. None of them recurse, so maze size is only limited by memory.
+
+
+def lattice_size(width, height):
+    return (width - 1) // 2, (height - 1) // 2
+
+
+def recursive_backtracker(width, height, rng=random):
+    """Depth-first carving with an explicit stack (the classic long-corridor maze)"""
+    grid = MazeGrid(width, height)
+    data = grid.data
+    cols, rows = lattice_size(width, height)
+    
+    # Work directly in grid indices. Everything except unvisited lattice cells is "blocked"; the
+    # border and one row of padding keep every +-2 / +-2*width probe in range without bounds checks.
+    blocked = np.ones((height + 2) * width, dtype=np.uint8)
+    blocked[:height * width].reshape(height, width)[1:2 * rows:2, 1:2 * cols:2] = 0
+    blocked = bytearray(blocked)
+    down = 2 * width
+    
+    start = (2 * rng.randrange(rows) + 1) * width + 2 * rng.randrange(cols) + 1
+    blocked[start] = 1
+    data[start] = PATH
+    stack = [start]
+    random_float = rng.random
+    
+    while stack:
+        cell = stack[-1]
+        options = []
+        if not blocked[cell - 2]:
+            options.append(cell - 2)
+        if not blocked[cell + 2]:
+            options.append(cell + 2)
+        if not blocked[cell - down]:
+            options.append(cell - down)
+        if not blocked[cell + down]:
+            options.append(cell + down)
+        
+        if not options:
+            stack.pop()
+            continue
+        
+        nxt = options[0] if len(options) == 1 else options[int(random_float() * len(options))]
+        blocked[nxt] = 1
+        data[(cell + nxt) // 2] = PATH
+        data[nxt] = PATH
+        stack.append(nxt)
+    
+    return grid
+
+
+def wilson(width, height, rng=random):
+    """Loop-erased random walks; produces a uniformly random spanning tree (unbiased maze)"""
+    grid = MazeGrid(width, height)
+    data = grid.data
+    cols, rows = lattice_size(width, height)
+    total = cols * rows
+    in_maze = bytearray(total)
+    exit_to = [0] * total  # Last step taken out of each cell during the current walk
+    
+    def to_grid(cell):
+        return (2 * (cell // cols) + 1) * width + 2 * (cell % cols) + 1
+    
+    first = rng.randrange(total)
+    in_maze[first] = 1
+    data[to_grid(first)] = PATH
+    
+    order = list(range(total))
+    rng.shuffle(order)
+    for start in order:
+        if in_maze[start]:
+            continue
+        
+        # Random walk until the maze is hit; overwriting exit_to erases any loops
+        cell = start
+        while not in_maze[cell]:
+            i = cell % cols
+            while True:
+                step = int(rng.random() * 4)
+                if step == 0 and i > 0:
+                    nxt = cell - 1
+                elif step == 1 and i < cols - 1:
+                    nxt = cell + 1
+                elif step == 2 and cell >= cols:
+                    nxt = cell - cols
+                elif step == 3 and cell + cols < total:
+                    nxt = cell + cols
+                else:
+                    continue
+                break
+            exit_to[cell] = nxt
+            cell = nxt
+        
+        # Retrace the loop-erased path and add it to the maze
+        cell = start
+        while not in_maze[cell]:
+            in_maze[cell] = 1
+            nxt = exit_to[cell]
+            here, there = to_grid(cell), to_grid(nxt)
+            data[here] = PATH
+            data[(here + there) // 2] = PATH
+            cell = nxt
+    
+    return grid
+
+
+def eller_rows(width, height=None, rng=random):
+    """Yield the maze one grid row (bytes) at a time with Eller's algorithm, in O(width) memory.
+    
+    With height=None the stream never ends; rows are only produced as the caller asks for them.
+    """
+    cols = (width - 1) // 2
+    rows = None if height is None else (height - 1) // 2
+    border = bytes([WALL]) * width
+    yield border
+    
+    sets = list(range(cols))                    # Set id of each cell in the current row
+    members = {i: [i] for i in range(cols)}     # Columns belonging to each set id
+    next_id = cols
+    
+    j = 0
+    while rows is None or j < rows:
+        last = rows is not None and j == rows - 1
+        j += 1
+        row = bytearray(border)
+        row[1:2 * cols:2] = bytes([PATH]) * cols
+        
+        # Randomly join adjacent cells from different sets (the last row joins them all)
+        for i in range(cols - 1):
+            a, b = sets[i], sets[i + 1]
+            if a != b and (last or rng.random() < 0.5):
+                row[2 * i + 2] = PATH
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for col in members[b]:
+                    sets[col] = a
+                members[a].extend(members.pop(b))
+        yield bytes(row)
+        
+        if last:
+            break
+        
+        # Every set must continue downwards at least once; other cells drop with probability 1/2
+        below = bytearray(border)
+        new_sets = [0] * cols
+        new_members = {}
+        for set_id, cols_in_set in members.items():
+            keep = rng.choice(cols_in_set)
+            for col in cols_in_set:
+                if col == keep or rng.random() < 0.5:
+                    below[2 * col + 1] = PATH
+                    new_sets[col] = set_id
+                    new_members.setdefault(set_id, []).append(col)
+        for col in range(cols):
+            if below[2 * col + 1] == WALL:
+                new_sets[col] = next_id
+                new_members[next_id] = [col]
+                next_id += 1
+        sets, members = new_sets, new_members
+        yield bytes(below)
+    
+    # Trailing rows (the bottom border, plus padding for even heights)
+    for _ in range(height - 1 - 2 * rows):
+        yield border
+
+
+def eller(width, height, rng=random):
+    grid = MazeGrid(width, height)
+    for y, row in enumerate(eller_rows(width, height, rng)):
+        grid.data[y * width:(y + 1) * width] = row
+    return grid
+
+
+def kruskal(width, height, rng=random):
+    """Join cells across walls in random order, skipping walls whose cells are already connected"""
+    grid = MazeGrid(width, height)
+    data = grid.data
+    cols, rows = lattice_size(width, height)
+    
+    # Open every cell with one slice assignment, then test walls in a shuffled order
+    grid.cells[1:2 * rows:2, 1:2 * cols:2] = PATH
+    cells = np.arange(cols * rows).reshape(rows, cols)
+    firsts = np.concatenate((cells[:, :-1].ravel(), cells[:-1, :].ravel()))
+    seconds = np.concatenate((cells[:, 1:].ravel(), cells[1:, :].ravel()))
+    order = np.random.default_rng(rng.getrandbits(64)).permutation(len(firsts))
+    firsts, seconds = firsts[order], seconds[order]
+    # Grid index of the wall square between each pair of cells
+    walls = ((2 * (firsts // cols) + 1) * width + 2 * (firsts % cols) + 1
+             + (2 * (seconds // cols) + 1) * width + 2 * (seconds % cols) + 1) // 2
+    
+    parent = list(range(cols * rows))
+    for a, b, wall in zip(firsts.tolist(), seconds.tolist(), walls.tolist()):
+        # Union-find with path halving
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a != b:
+            parent[b] = a
+            data[wall] = PATH
+    
+    return grid
+
+
+GENERATORS = {
+    "backtracker": recursive_backtracker,
+    "wilson": wilson,
+    "eller": eller,
+    "kruskal": kruskal,
+}
@@ -0,0 +1,90 @@
+import random
+import numpy as np
+
+# Cell values stored in MazeGrid
+PATH = 0
+WALL = 1
+
+
+class MazeGrid:
+    """Maze cells in one flat bytearray, with a NumPy view of the same memory for bulk work"""
+    DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Down, Right, Up, Left
+    
+    def __init__(self, width, height, fill=WALL):
+        self.width = width
+        self.height = height
+        self.data = bytearray([fill]) * (width * height)  # Row-major: index = y * width + x
+        self.cells = np.frombuffer(self.data, dtype=np.uint8).reshape(height, width)
+    
+    @classmethod
+    def from_rows(cls, rows):
+        # Build a grid from strings such as ["#####", "#   #", ...]
+        grid = cls(len(rows[0]), len(rows))
+        for y, row in enumerate(rows):
+            for x, char in enumerate(row):
+                grid.data[y * grid.width + x] = WALL if char == '#' else PATH
+        return grid
+    
+    def to_rows(self):
+        return ["".join('#' if cell == WALL else ' ' for cell in row) for row in self.cells]
+    
+    def copy(self):
+        grid = MazeGrid(self.width, self.height)
+        grid.data[:] = self.data
+        return grid
+    
+    def __len__(self):
+        return self.height
+    
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+    
+    def is_walkable(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.data[y * self.width + x] == PATH
+    
+    def is_wall(self, x, y):
+        return self.data[y * self.width + x] == WALL
+    
+    def set_cell(self, x, y, value):
+        self.data[y * self.width + x] = value
+    
+    def carve(self, x, y):
+        self.data[y * self.width + x] = PATH
+    
+    def neighbors(self, x, y):
+        # Walkable 4-connected neighbours of (x, y)
+        return [(x + dx, y + dy) for dx, dy in self.DIRECTIONS if self.is_walkable(x + dx, y + dy)]
+    
+    def walkable_mask(self):
+        return self.cells == PATH
+    
+    def walkable_cells(self, x0=0, y0=0, x1=None, y1=None):
+        # All walkable (x, y) inside the half-open box [x0, x1) x [y0, y1), in row-major order
+        x1 = self.width if x1 is None else x1
+        y1 = self.height if y1 is None else y1
+        ys, xs = np.nonzero(self.cells[y0:y1, x0:x1] == PATH)
+        return list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+    
+    def walkable_count(self):
+        return self.width * self.height - int(np.count_nonzero(self.cells))
+    
+    def add_openings(self, probability, rng=random):
+        """Knock out random interior walls, never completing a fully open 2x2 block"""
+        cells = self.cells
+        height, width = cells.shape
+        noise = np.random.default_rng(rng.getrandbits(64)).random((height - 2, width - 2))
+        candidates = np.zeros(cells.shape, dtype=bool)
+        candidates[1:-1, 1:-1] = (cells[1:-1, 1:-1] == WALL) & (noise < probability)
+        
+        # Squares with the same (x % 2, y % 2) never share a 2x2 block, so each parity class can be
+        # checked against the current grid and opened in a single step
+        ys, xs = np.indices(cells.shape)
+        for parity_y in (0, 1):
+            for parity_x in (0, 1):
+                open_cells = (cells == PATH).astype(np.uint8)
+                # Blocks (by top-left corner) that one more open square would complete
+                nearly_full = np.pad(
+                    open_cells[:-1, :-1] + open_cells[:-1, 1:] + open_cells[1:, :-1] + open_cells[1:, 1:] == 3, 1)
+                blocked = nearly_full[:-1, :-1] | nearly_full[:-1, 1:] | nearly_full[1:, :-1] | nearly_full[1:, 1:]
+                chosen = candidates & ~blocked & (ys % 2 == parity_y) & (xs % 2 == parity_x)
+                cells[chosen] = PATH
@@ -0,0 +1,475 @@
+import heapq
+import numpy as np
+from collections import deque
+
+from grid_search import JumpPointSearch
+
+
+def manhattan_distance(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def a_star_search(grid, start, goal):
+    # A* search algorithm with priority queue
+    frontier = [(0, start)]  # (priority, position)
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        
+        if current == goal:
+            break
+            
+        for next_pos in grid.neighbors(*current):
+            new_cost = cost_so_far[current] + 1
+            
+            if next_pos not in cost_so_far or new_cost < cost_so_far[next_pos]:
+                cost_so_far[next_pos] = new_cost
+                priority = new_cost + manhattan_distance(next_pos, goal)
+                heapq.heappush(frontier, (priority, next_pos))
+                came_from[next_pos] = current
+    
+    # Reconstruct path
+    if goal not in came_from:
+        return None
+        
+    path = [goal]
+    current = goal
+    while current != start:
+        current = came_from[current]
+        path.append(current)
+    path.reverse()
+    
+    return path
+
+
+class ChaserPlanner:
+    """Shortest path from a chaser to a moving target on a static grid, repaired between turns.
+    
+    The cached path is kept shortest across moves instead of being searched again:
+    - the chaser stepping along it just drops the first cell;
+    - the target stepping back along it drops the last cell;
+    - the target stepping elsewhere extends it by one cell. On a 4-connected grid the new distance
+      is then either that length or two less, and the learned heuristic below usually proves which.
+    Only when it cannot does the planner run A*, and that A* uses heuristics learned from earlier
+    searches (Adaptive A*), which stay admissible as the target moves, so it expands few cells.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.path = None          # deque of cells, chaser first and target last
+        self.learned = {}         # cell -> (lower bound on distance to the target, target_moves then)
+        self.target_moves = 0     # Number of one-cell target moves seen so far
+        self.searches = 0
+        self.expansions = 0
+    
+    def heuristic(self, cell, target):
+        h = manhattan_distance(cell, target)
+        entry = self.learned.get(cell)
+        if entry is not None:
+            # Each one-cell target move can shorten the true distance by at most one
+            h = max(h, entry[0] - (self.target_moves - entry[1]))
+        return h
+    
+    def next_step(self, start, target):
+        if start == target:
+            return start
+        
+        path = self.path
+        if path is not None and len(path) > 1 and path[1] == start:
+            path.popleft()  # The chaser took the step we returned last time
+        
+        if path is None or path[0] != start:
+            self.reset()
+            self.search(start, target)
+        elif path[-1] != target:
+            if manhattan_distance(path[-1], target) != 1:
+                self.reset()
+                self.search(start, target)
+            else:
+                self.target_moves += 1
+                if len(path) > 1 and path[-2] == target:
+                    path.pop()
+                else:
+                    path.append(target)
+                    # A shortcut would be two steps shorter; search only if the bound allows one
+                    if self.heuristic(start, target) < len(path) - 1:
+                        self.search(start, target)
+        
+        if self.path is None or len(self.path) < 2:
+            return None
+        return self.path[1]
+    
+    def reset(self):
+        self.path = None
+        self.learned.clear()
+    
+    def search(self, start, goal):
+        # A* with the learned heuristic; afterwards every expanded cell learns its exact distance bound
+        self.searches += 1
+        frontier = [(self.heuristic(start, goal), 0, start)]
+        came_from = {start: None}
+        cost_so_far = {start: 0}
+        closed = []
+        
+        while frontier:
+            _, cost, current = heapq.heappop(frontier)
+            if cost > cost_so_far[current]:
+                continue  # Stale entry
+            if current == goal:
+                break
+            closed.append(current)
+            self.expansions += 1
+            
+            for next_pos in self.grid.neighbors(*current):
+                new_cost = cost + 1
+                if next_pos not in cost_so_far or new_cost < cost_so_far[next_pos]:
+                    cost_so_far[next_pos] = new_cost
+                    came_from[next_pos] = current
+                    heapq.heappush(frontier, (new_cost + self.heuristic(next_pos, goal), new_cost, next_pos))
+        
+        if goal not in came_from:
+            self.path = None
+            return
+        
+        total = cost_so_far[goal]
+        for cell in closed:
+            self.learned[cell] = (total - cost_so_far[cell], self.target_moves)
+        
+        path = deque([goal])
+        current = goal
+        while current != start:
+            current = came_from[current]
+            path.appendleft(current)
+        self.path = path
+
+
+# Mazes with at most this many open cells get an all-pairs next-hop table (one byte per pair)
+ALL_PAIRS_LIMIT = 600
+
+
+def distance_field(walkable, target):
+    """BFS distance from every cell to target (-1 where unreachable), expanded one wavefront at a time.
+    
+    Each wavefront is handled with array operations over a flat, wall-padded copy of the grid, so the
+    Python-level cost is per distance layer rather than per cell.
+    """
+    height, width = walkable.shape
+    stride = width + 2
+    unvisited = np.zeros((height + 2) * stride, dtype=bool)
+    unvisited.reshape(height + 2, stride)[1:-1, 1:-1] = walkable
+    dist = np.full(unvisited.size, -1, dtype=np.int32)
+    
+    start = (target[1] + 1) * stride + target[0] + 1
+    dist[start] = 0
+    unvisited[start] = False
+    frontier = np.array([start])
+    offsets = np.array([1, -1, stride, -stride])
+    distance = 0
+    
+    while frontier.size:
+        distance += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        frontier = np.unique(candidates[unvisited[candidates]])
+        unvisited[frontier] = False
+        dist[frontier] = distance
+    
+    return dist.reshape(height + 2, stride)[1:-1, 1:-1]
+
+
+class DistanceFieldChaser:
+    """Steps down a distance field toward the target; the field is rebuilt only when the target moves"""
+    def __init__(self, grid):
+        self.grid = grid
+        self.walkable = grid.walkable_mask()
+        self.target = None
+        self.field = None
+        self.builds = 0
+    
+    def distances(self, target):
+        if target != self.target:
+            self.field = distance_field(self.walkable, target)
+            self.target = target
+            self.builds += 1
+        return self.field
+    
+    def next_step(self, start, target, blocked=()):
+        # Cells in blocked (other chasers sharing this field) are skipped unless they hold the target
+        if start == target:
+            return start
+        field = self.distances(target)
+        best = None
+        best_dist = field[start[1], start[0]]
+        for nx, ny in self.grid.neighbors(*start):
+            dist = field[ny, nx]
+            if 0 <= dist < best_dist and (dist == 0 or (nx, ny) not in blocked):
+                best, best_dist = (nx, ny), dist
+        return best
+
+
+class NextHopTable:
+    """All-pairs first step for small mazes: next_step is a single table lookup.
+    
+    Distances from every cell are grown simultaneously as boolean wavefront matrices, then reduced to
+    the index (0-3, in DIRECTIONS order) of the best neighbour, stored as one uint8 per pair.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        cells = grid.walkable_cells()
+        count = len(cells)
+        self.index = {cell: i for i, cell in enumerate(cells)}
+        
+        # Neighbour index per direction; `count` is a sentinel row that is never reached
+        neighbours = np.full((count, 4), count, dtype=np.int32)
+        for i, (x, y) in enumerate(cells):
+            for k, (dx, dy) in enumerate(grid.DIRECTIONS):
+                j = self.index.get((x + dx, y + dy))
+                if j is not None:
+                    neighbours[i, k] = j
+        
+        unreachable = np.iinfo(np.int16).max
+        dist = np.full((count + 1, count), unreachable, dtype=np.int16)
+        frontier = np.zeros((count + 1, count), dtype=bool)
+        frontier[np.arange(count), np.arange(count)] = True
+        reached = frontier[:count].copy()
+        dist[:count][reached] = 0
+        distance = 0
+        
+        while True:
+            distance += 1
+            grown = (frontier[neighbours[:, 0]] | frontier[neighbours[:, 1]]
+                     | frontier[neighbours[:, 2]] | frontier[neighbours[:, 3]])
+            grown &= ~reached
+            if not grown.any():
+                break
+            reached |= grown
+            dist[:count][grown] = distance
+            frontier[:count] = grown
+        
+        # next_hop[s, t]: direction from s that lowers the distance to t
+        self.next_hop = np.argmin(dist[neighbours], axis=1).astype(np.uint8)
+        self.reachable = reached
+    
+    def next_step(self, start, target):
+        if start == target:
+            return start
+        s, t = self.index[start], self.index[target]
+        if not self.reachable[s, t]:
+            return None
+        dx, dy = self.grid.DIRECTIONS[self.next_hop[s, t]]
+        return (start[0] + dx, start[1] + dy)
+
+
+class CorridorGraph:
+    """Junction graph of a maze: corridors collapse into weighted edges and dead ends are pruned.
+    
+    Nodes are open cells with other than two open neighbours (junctions and dead ends). Every run of
+    two-neighbour cells between them becomes one edge whose weight is its length in steps. Repeatedly
+    stripping degree-1 nodes marks the dead-end trees hanging off the looped core of the maze (all of
+    it but one node, for a perfect maze); a query only descends into a dead-end tree along the chain
+    leading to its own start or goal, since a shortest path never enters one for any other reason.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        walkable = grid.walkable_mask()
+        padded = np.pad(walkable, 1)
+        degree = (padded[:-2, 1:-1].astype(np.uint8) + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:])
+        ys, xs = np.nonzero(walkable & (degree != 2))
+        self.nodes = list(zip(xs.tolist(), ys.tolist()))
+        self.node_id = {cell: i for i, cell in enumerate(self.nodes)}
+        self.edges = []              # (node_a, node_b, interior cells ordered from a to b)
+        self.adjacency = [[] for _ in self.nodes]  # node -> [(edge_id, other node, weight)]
+        self.corridor = {}           # interior cell -> (edge_id, index in the edge's cell list)
+        
+        self._trace_edges(range(len(self.nodes)))
+        # Rings of two-neighbour cells have no node yet; promote one cell of each ring
+        for cell in zip(*np.nonzero(walkable & (degree == 2))[::-1]):
+            cell = (int(cell[0]), int(cell[1]))
+            if cell not in self.corridor and cell not in self.node_id:
+                self.node_id[cell] = len(self.nodes)
+                self.nodes.append(cell)
+                self.adjacency.append([])
+                self._trace_edges([self.node_id[cell]])
+        self._prune_dead_ends()
+    
+    def _trace_edges(self, node_ids):
+        traced = set()  # (node cell, first step) pairs already covered from either end
+        for a in node_ids:
+            start = self.nodes[a]
+            for first in self.grid.neighbors(*start):
+                if (start, first) in traced:
+                    continue
+                # Walk the corridor until the next node
+                cells = []
+                prev, current = start, first
+                while current not in self.node_id:
+                    cells.append(current)
+                    prev, current = current, next(n for n in self.grid.neighbors(*current) if n != prev)
+                b = self.node_id[current]
+                traced.add((start, first))
+                traced.add((current, prev))
+                
+                edge_id = len(self.edges)
+                self.edges.append((a, b, cells))
+                weight = len(cells) + 1
+                self.adjacency[a].append((edge_id, b, weight))
+                if b != a:
+                    self.adjacency[b].append((edge_id, a, weight))
+                for i, cell in enumerate(cells):
+                    self.corridor[cell] = (edge_id, i)
+    
+    def _prune_dead_ends(self):
+        # parent[n] is the neighbour a stripped node hangs from; None for core nodes
+        self.parent = [None] * len(self.nodes)
+        degree = [sum(2 if other == node else 1 for _, other, _ in adj) for node, adj in enumerate(self.adjacency)]
+        removed = [False] * len(self.nodes)
+        stack = [n for n, d in enumerate(degree) if d == 1]
+        while stack:
+            node = stack.pop()
+            if removed[node] or degree[node] != 1:
+                continue
+            removed[node] = True
+            for _, other, _ in self.adjacency[node]:
+                if not removed[other]:
+                    self.parent[node] = other
+                    degree[other] -= 1
+                    if degree[other] == 1:
+                        stack.append(other)
+        self.dead = removed
+    
+    def _anchors(self, cell):
+        # Graph nodes reachable from cell without passing another node, with their costs
+        node = self.node_id.get(cell)
+        if node is not None:
+            return [(node, 0)]
+        edge_id, index = self.corridor[cell]
+        a, b, cells = self.edges[edge_id]
+        return [(a, index + 1), (b, len(cells) - index)]
+    
+    def _chain(self, node, allowed):
+        while node is not None and self.dead[node] and node not in allowed:
+            allowed.add(node)
+            node = self.parent[node]
+        if node is not None:
+            allowed.add(node)
+    
+    def find_path(self, start, goal):
+        """Shortest cell path from start to goal (both ends included), or None"""
+        if start == goal:
+            return [start]
+        self.expansions = 0
+        start_anchors, goal_anchors = self._anchors(start), self._anchors(goal)
+        goal_cost = {}
+        for node, cost in goal_anchors:
+            goal_cost[node] = min(cost, goal_cost.get(node, cost))
+        
+        allowed = set()
+        for node, _ in start_anchors + goal_anchors:
+            self._chain(node, allowed)
+        
+        best_total = float("inf")
+        best_end = None
+        # Both on the same corridor: the direct run along it is a candidate too
+        if start in self.corridor and goal in self.corridor and self.corridor[start][0] == self.corridor[goal][0]:
+            best_total = abs(self.corridor[start][1] - self.corridor[goal][1])
+            best_end = "direct"
+        
+        frontier = []
+        cost_so_far = {}
+        came_from = {}
+        for node, cost in start_anchors:
+            if cost < cost_so_far.get(node, float("inf")):
+                cost_so_far[node] = cost
+                came_from[node] = None
+                heapq.heappush(frontier, (cost + manhattan_distance(self.nodes[node], goal), cost, node))
+        
+        while frontier:
+            priority, cost, node = heapq.heappop(frontier)
+            if priority >= best_total:
+                break
+            if cost > cost_so_far[node]:
+                continue
+            self.expansions += 1
+            if node in goal_cost and cost + goal_cost[node] < best_total:
+                best_total = cost + goal_cost[node]
+                best_end = node
+            for edge_id, other, weight in self.adjacency[node]:
+                if self.dead[other] and other not in allowed:
+                    continue  # A dead-end tree that holds neither endpoint
+                new_cost = cost + weight
+                if new_cost < cost_so_far.get(other, float("inf")):
+                    cost_so_far[other] = new_cost
+                    came_from[other] = (node, edge_id)
+                    heapq.heappush(frontier, (new_cost + manhattan_distance(self.nodes[other], goal), new_cost, other))
+        
+        if best_end is None:
+            return None
+        if best_end == "direct":
+            i, j = self.corridor[start][1], self.corridor[goal][1]
+            cells = self.edges[self.corridor[start][0]][2]
+            return cells[i:j + 1] if i <= j else cells[j:i + 1][::-1]
+        
+        # Expand node/edge hops back into cells, walking from the goal towards the start
+        path = self._cells_to_anchor(goal, best_end)
+        node = best_end
+        path.append(self.nodes[node])
+        while came_from[node] is not None:
+            prev, edge_id = came_from[node]
+            a, b, cells = self.edges[edge_id]
+            path.extend(reversed(cells) if a == prev else cells)
+            path.append(self.nodes[prev])
+            node = prev
+        path.extend(reversed(self._cells_to_anchor(start, node)))
+        path.reverse()
+        return path
+    
+    def _cells_to_anchor(self, cell, node):
+        # Cells from cell up to (not including) the node it anchors to, along the cheaper side
+        if cell == self.nodes[node]:
+            return []
+        edge_id, index = self.corridor[cell]
+        a, b, cells = self.edges[edge_id]
+        if a == node and (b != node or index + 1 <= len(cells) - index):
+            return cells[index::-1]
+        return cells[index:]
+
+
+class CorridorChaser:
+    """Chases along shortest paths found on the corridor graph"""
+    def __init__(self, grid):
+        self.graph = CorridorGraph(grid)
+    
+    def next_step(self, start, target):
+        path = self.graph.find_path(start, target)
+        if not path:
+            return None
+        return path[1] if len(path) > 1 else start
+
+
+class JumpPointChaser:
+    """Chases along Jump Point Search paths over the maze's walkability grid"""
+    def __init__(self, grid):
+        self.search = JumpPointSearch(grid.walkable_mask())
+    
+    def next_step(self, start, target):
+        path = self.search.find_path(start, target)
+        if not path:
+            return None
+        return path[1] if len(path) > 1 else start
+
+
+CHASERS = {
+    "table": NextHopTable,            # O(n^2) bytes, O(1) per step
+    "field": DistanceFieldChaser,     # O(n) bytes, O(n) vectorised work per target move
+    "incremental": ChaserPlanner,     # O(path) bytes, usually O(1) per step
+    "corridor": CorridorChaser,       # O(n) bytes, one search over junctions per step
+    "jps": JumpPointChaser,           # O(n) bytes, one jump point search per step
+}
+
+
+def make_chaser(grid, strategy="auto", all_pairs_limit=ALL_PAIRS_LIMIT):
+    # Memory/latency trade-off: precompute every answer while the table stays small, otherwise search
+    # the compressed corridor graph (cheaper per move than rebuilding a whole field for one chaser)
+    if strategy == "auto":
+        strategy = "table" if grid.walkable_count() <= all_pairs_limit else "corridor"
+    return CHASERS[strategy](grid)
@@ -0,0 +1,248 @@
+import random
+import time
+import numpy as np
+
+from maze_generation import GENERATORS
+from maze_planner import make_chaser, distance_field, a_star_search, manhattan_distance, DistanceFieldChaser
+
+# Level parameters; Hard has no fixed size (the GUI fits it to the screen, simulations pass one in).
+# Crowd is Hard with a pack of chasers that share one flow field (levels without "chasers" have one)
+DIFFICULTY_SETTINGS = {
+    "Easy": {"size": 15, "ai_speed": 1, "opening_factor": 0.1, "optimal_move_chance": 0.7, "algorithm": "backtracker"},
+    "Medium": {"size": 21, "ai_speed": 2, "opening_factor": 0.05, "optimal_move_chance": 0.9, "algorithm": "backtracker"},
+    "Hard": {"size": None, "ai_speed": 3, "opening_factor": 0.01, "optimal_move_chance": 1.0, "algorithm": "backtracker"},
+    "Crowd": {"size": None, "ai_speed": 2, "opening_factor": 0.03, "optimal_move_chance": 1.0, "algorithm": "backtracker",
+              "chasers": 5}
+}
+
+# Levels whose chasers follow shortest paths instead of the greedy Manhattan step
+PATHFINDING_LEVELS = ("Hard", "Crowd")
+
+MOVES = {"Up": (0, -1), "Down": (0, 1), "Left": (-1, 0), "Right": (1, 0)}
+
+
+class MazeSimulation:
+    """One maze game without any GUI: generate from a seed, step the player, let the chaser reply"""
+    def __init__(self, difficulty, size, seed=None, settings=None, layout=None):
+        self.difficulty = difficulty
+        self.settings = settings or DIFFICULTY_SETTINGS[difficulty]
+        self.size = size
+        # Every game gets a seed, so any game can be replayed; the seed alone fixes maze and placement
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        
+        start = time.perf_counter()
+        if layout is None:
+            self.maze = self.generate_maze(size, size)
+            self.place_entities(size)
+        else:
+            # (maze, player_pos, exit_pos, ai_positions) saved for this seed, e.g. by MazeCache
+            self.maze, self.player_pos, self.exit_pos, ai_positions = layout
+            self.ai_positions = [tuple(pos) for pos in ai_positions]
+        
+        # AI choices draw from their own stream, so a loaded layout plays exactly like a generated one
+        self.rng = random.Random(f"ai:{self.seed}")
+        if self.difficulty not in PATHFINDING_LEVELS:
+            self.chaser = None  # Greedy Manhattan steps need no search structure
+        elif len(self.ai_positions) > 1:
+            # One distance field from the player, rebuilt once per player move and read by every chaser
+            self.chaser = DistanceFieldChaser(self.maze)
+        else:
+            self.chaser = make_chaser(self.maze)
+        self.generation_time = time.perf_counter() - start
+        
+        self.status = "running"  # "running", "escaped" or "caught"
+        self.move_count = 0
+        self.ai_latencies = []   # Seconds spent moving the AI after each player step
+    
+    def generate_maze(self, width, height):
+        # Carve a perfect maze with the level's generator (all of them are iterative)
+        maze = GENERATORS[self.settings["algorithm"]](width, height, self.rng)
+        
+        # Add random openings based on difficulty
+        maze.add_openings(self.settings["opening_factor"], self.rng)
+        
+        return maze
+    
+    def place_entities(self, size):
+        # Coordinates of all empty cells
+        ys, xs = np.nonzero(self.maze.walkable_mask())
+        
+        if not len(xs):
+            return  # No empty cells (shouldn't happen)
+        
+        half = size // 2
+        everywhere = np.arange(len(xs))
+        
+        # Place player in top-left area
+        top_left = np.flatnonzero((xs < half) & (ys < half))
+        player = self.rng.choice(top_left if len(top_left) else everywhere)
+        self.player_pos = (int(xs[player]), int(ys[player]))
+        
+        # Place exit in bottom-right area
+        others = everywhere != player
+        bottom_right = np.flatnonzero((xs >= half) & (ys >= half) & others)
+        exit_cell = self.rng.choice(bottom_right if len(bottom_right) else np.flatnonzero(others))
+        self.exit_pos = (int(xs[exit_cell]), int(ys[exit_cell]))
+        
+        # Place AI far from player
+        available = np.flatnonzero(others & (everywhere != exit_cell))
+        distance = np.abs(xs[available] - xs[player]) + np.abs(ys[available] - ys[player])
+        
+        # Choose the chasers among the farthest positions (the top tenth by distance, without a full sort)
+        chasers = min(self.settings.get("chasers", 1), len(available))
+        count = max(chasers, len(available) // 10)
+        far_positions = available[np.argpartition(-distance, count - 1)[:count]]
+        if chasers > 1:
+            chosen = self.rng.sample(list(far_positions), chasers)
+        else:
+            chosen = [self.rng.choice(far_positions)]
+        self.ai_positions = [(int(xs[ai]), int(ys[ai])) for ai in chosen]
+    
+    @property
+    def ai_pos(self):
+        # The first chaser; single-chaser levels only have this one
+        return self.ai_positions[0]
+    
+    def nearest_ai(self, pos):
+        return min(self.ai_positions, key=lambda ai: manhattan_distance(ai, pos))
+    
+    @property
+    def caught(self):
+        return self.player_pos in self.ai_positions
+    
+    @property
+    def running(self):
+        return self.status == "running"
+    
+    def is_valid_move(self, x, y):
+        return self.maze.is_walkable(x, y)
+    
+    def step(self, dx, dy):
+        """Move the player by (dx, dy) and let the AI respond; returns False if the move was not legal"""
+        if not self.running:
+            return False
+        
+        new_pos = (self.player_pos[0] + dx, self.player_pos[1] + dy)
+        if not self.is_valid_move(*new_pos):
+            return False
+        
+        self.player_pos = new_pos
+        self.move_count += 1
+        
+        # Walking into a chaser loses immediately; reaching the exit wins
+        if self.caught:
+            self.status = "caught"
+            return True
+        if self.player_pos == self.exit_pos:
+            self.status = "escaped"
+            return True
+        
+        # Move AI
+        start = time.perf_counter()
+        for _ in range(self.settings["ai_speed"]):
+            self.move_ai()
+            
+            # Check if any chaser caught the player
+            if self.caught:
+                self.status = "caught"
+                break
+        self.ai_latencies.append(time.perf_counter() - start)
+        return True
+    
+    def move_ai(self):
+        # Chasers move one after another, so in a crowd each sees where the others have just stepped
+        for i, pos in enumerate(self.ai_positions):
+            self.ai_positions[i] = self.move_chaser(pos, i)
+            if self.ai_positions[i] == self.player_pos:
+                break
+    
+    def move_chaser(self, pos, index):
+        if self.difficulty in PATHFINDING_LEVELS:
+            if len(self.ai_positions) > 1:
+                # Shared flow field; stepping onto another chaser is avoided so the pack spreads over routes
+                others = self.ai_positions[:index] + self.ai_positions[index + 1:]
+                next_pos = self.chaser.next_step(pos, self.player_pos, blocked=others)
+            else:
+                # Shortest-path chase from a precomputed table (small mazes) or the corridor graph
+                next_pos = self.chaser.next_step(pos, self.player_pos)
+            return pos if next_pos is None else next_pos
+        
+        # Simpler pathfinding for Easy/Medium
+        possible_moves = self.maze.neighbors(*pos)
+        if not possible_moves:
+            return pos
+        
+        # Choose move based on difficulty
+        if self.rng.random() < self.settings["optimal_move_chance"]:
+            # Sort by distance to player (ascending)
+            possible_moves.sort(key=lambda move: manhattan_distance(move, self.player_pos))
+            return possible_moves[0]  # Best move
+        # Random move
+        return self.rng.choice(possible_moves)
+    
+    def a_star_search(self, start, goal):
+        return a_star_search(self.maze, start, goal)
+
+
+# Scripted players for headless runs: each returns a (dx, dy) move for the current state
+
+
+class RandomPlayer:
+    def __init__(self, sim, rng):
+        self.sim, self.rng = sim, rng
+    
+    def move(self):
+        x, y = self.sim.player_pos
+        nx, ny = self.rng.choice(self.sim.maze.neighbors(x, y))
+        return nx - x, ny - y
+
+
+class GreedyPlayer(RandomPlayer):
+    # Heads for the exit as the crow flies, like a player who ignores the walls ahead
+    def move(self):
+        x, y = self.sim.player_pos
+        options = self.sim.maze.neighbors(x, y)
+        self.rng.shuffle(options)
+        nx, ny = min(options, key=lambda pos: manhattan_distance(pos, self.sim.exit_pos))
+        return nx - x, ny - y
+
+
+class ShortestPathPlayer(RandomPlayer):
+    # Follows a distance field from the exit (built once, the exit never moves)
+    def __init__(self, sim, rng):
+        super().__init__(sim, rng)
+        self.field = distance_field(sim.maze.walkable_mask(), sim.exit_pos)
+    
+    def move(self):
+        x, y = self.sim.player_pos
+        nx, ny = min(self.sim.maze.neighbors(x, y), key=lambda pos: self.field[pos[1], pos[0]])
+        return nx - x, ny - y
+
+
+class CautiousPlayer(ShortestPathPlayer):
+    # Shortest path to the exit, but backs off from any step that lands next to a chaser
+    def move(self):
+        x, y = self.sim.player_pos
+        options = self.sim.maze.neighbors(x, y)
+        safe = [pos for pos in options if manhattan_distance(pos, self.sim.nearest_ai(pos)) > 1] or options
+        nx, ny = min(safe, key=lambda pos: self.field[pos[1], pos[0]])
+        return nx - x, ny - y
+
+
+PLAYER_POLICIES = {
+    "random": RandomPlayer,
+    "greedy": GreedyPlayer,
+    "shortest": ShortestPathPlayer,
+    "cautious": CautiousPlayer,
+}
+
+
+def play_game(difficulty, size, seed, policy, max_steps=None):
+    """Play one seeded game with a scripted player; returns the finished simulation"""
+    sim = MazeSimulation(difficulty, size, seed)
+    player = PLAYER_POLICIES[policy](sim, random.Random(f"player:{seed}"))
+    max_steps = max_steps or 4 * size * size
+    while sim.running and sim.move_count < max_steps:
+        sim.step(*player.move())
+    return sim
@@ -0,0 +1,673 @@
+import heapq
+import math
+import numpy as np
+
+from segmentation import connected_labels
+
+# Road-network preprocessing for map routing. The road mask is thinned to a one-pixel skeleton, and
+# the skeleton becomes a graph: junctions and end points are nodes, the pixel runs between them are
+# edges weighted by their length (1 per straight step, sqrt(2) per diagonal one). Positions are
+# (x, y) tuples; pixels inside the graph are flat indices y * width + x. Large maps are thinned in
+# row bands and the skeleton is kept as a sorted index array, so nothing map-sized is allocated.
+
+
+def thinning_tables():
+    # Zhang-Suen removal decision for each 8-neighbourhood code (bit i set: neighbour P(i+2) is road,
+    # P2..P9 clockwise from north), one table per sub-iteration
+    bits = (np.arange(256)[:, None] >> np.arange(8)) & 1
+    p2, p3, p4, p5, p6, p7, p8, p9 = bits.T
+    count = bits.sum(axis=1)
+    transitions = ((bits == 0) & (np.roll(bits, -1, axis=1) == 1)).sum(axis=1)
+    removable = (count >= 2) & (count <= 6) & (transitions == 1)
+    first = removable & (p2 * p4 * p6 == 0) & (p4 * p6 * p8 == 0)
+    second = removable & (p2 * p4 * p8 == 0) & (p2 * p6 * p8 == 0)
+    return first, second
+
+
+THINNING_TABLES = thinning_tables()
+THIN_BAND_ROWS = 512  # Grid rows thinned at a time
+THIN_HALO_ROWS = 32  # Context rows either side of a band; doubled for roads too wide to thin within it
+
+
+def thinning(mask):
+    # Zhang-Suen thinning of a boolean mask; returns (skeleton, sub-iterations that removed pixels)
+    skeleton = np.zeros(mask.shape, dtype=bool)
+    ys, xs = np.nonzero(mask)
+    if not len(xs):
+        return skeleton, 0
+    
+    # Work on the padded bounding box, visiting road pixels only (by flat index)
+    y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+    box = np.pad(mask[y0:y1, x0:x1], 1).astype(np.uint8)
+    stride = box.shape[1]
+    image = box.ravel()
+    neighbours = np.array([-stride, -stride + 1, 1, stride + 1, stride, stride - 1, -1, -stride - 1])
+    active = np.flatnonzero(image)
+    
+    passes = 0
+    changed = True
+    while changed:
+        changed = False
+        for table in THINNING_TABLES:
+            codes = np.zeros(len(active), dtype=np.uint8)
+            for bit, offset in enumerate(neighbours):
+                codes |= image[active + offset] << bit
+            remove = table[codes]
+            if remove.any():
+                image[active[remove]] = 0
+                active = active[~remove]
+                changed = True
+                passes += 1
+    
+    skeleton[y0:y1, x0:x1] = box[1:-1, 1:-1].astype(bool)
+    return skeleton, passes
+
+
+def thin(mask):
+    """Zhang-Suen thinning of a boolean mask to 8-connected lines one pixel wide"""
+    return thinning(mask)[0]
+
+
+def thin_pixels(grid, band=THIN_BAND_ROWS, halo=THIN_HALO_ROWS):
+    """Skeleton of the road pixels (grid > 0) as ascending flat indices y * width + x.
+    
+    The grid is thinned one band of rows at a time with halo rows of context either side, so it may
+    be a memory map larger than RAM: only a band is ever held as a mask, and the skeleton is kept
+    as indices. Each sub-iteration only looks one pixel further, so a band whose thinning finishes
+    within half its halo matches thinning the whole grid; a band that takes longer (a road wider
+    than the halo) is thinned again with twice the halo.
+    """
+    height, width = grid.shape
+    parts = [np.zeros(0, dtype=np.int64)]
+    for top in range(0, height, band):
+        bottom = min(top + band, height)
+        context = halo
+        while True:
+            above, below = max(top - context, 0), min(bottom + context, height)
+            skeleton, passes = thinning(np.asarray(grid[above:below]) > 0)
+            if 2 * passes <= context or (above == 0 and below == height):
+                break
+            context *= 2
+        parts.append(np.flatnonzero(skeleton[top - above:bottom - above]) + top * width)
+    return np.concatenate(parts)
+
+
+class SpatialIndex:
+    """Bucket grid over a set of points for nearest-point queries"""
+    def __init__(self, xs, ys, bucket=32):
+        self.bucket = bucket
+        self.columns = int(xs.max()) // bucket + 1 if len(xs) else 1
+        self.rows = int(ys.max()) // bucket + 1 if len(ys) else 1
+        keys = (ys // bucket) * self.columns + xs // bucket
+        order = np.argsort(keys, kind="stable")
+        self.xs, self.ys = xs[order], ys[order]
+        self.ids = order  # Position of each indexed point in the arrays passed in
+        self.starts = np.searchsorted(keys[order], np.arange(self.rows * self.columns + 1))
+    
+    def nearest(self, x, y):
+        """Index (into the arrays passed in) of the point nearest to (x, y), or None when empty"""
+        if not len(self.xs):
+            return None
+        bx = min(max(int(x) // self.bucket, 0), self.columns - 1)
+        by = min(max(int(y) // self.bucket, 0), self.rows - 1)
+        best, best_dist = None, math.inf
+        ring = 0
+        while True:
+            for row in range(by - ring, by + ring + 1):
+                if not 0 <= row < self.rows:
+                    continue
+                # Whole rows at the top and bottom of the ring, only the two end buckets in between
+                step = 1 if abs(row - by) == ring else max(2 * ring, 1)
+                for column in range(bx - ring, bx + ring + 1, step):
+                    if not 0 <= column < self.columns:
+                        continue
+                    bucket = row * self.columns + column
+                    lo, hi = self.starts[bucket], self.starts[bucket + 1]
+                    if lo == hi:
+                        continue
+                    dist = (self.xs[lo:hi] - x) ** 2 + (self.ys[lo:hi] - y) ** 2
+                    i = int(np.argmin(dist))
+                    if dist[i] < best_dist:
+                        best, best_dist = lo + i, dist[i]
+            # Points in the next ring are at least ring * bucket away
+            if best is not None and math.sqrt(best_dist) <= ring * self.bucket:
+                return int(self.ids[best])
+            if ring > max(self.rows, self.columns):
+                return None if best is None else int(self.ids[best])
+            ring += 1
+
+
+class RoadGraph:
+    """Junction graph of a road skeleton, with snapping of arbitrary points onto the skeleton.
+    
+    Skeleton pixels without exactly two neighbours are junction or end pixels; each 8-connected group
+    of them is one node, placed at the group's most central pixel. nodes holds (x, y) per node, edges
+    holds (a, b, length, pixels) with the pixels between the two nodes ordered from a to b, and the
+    length measured along the polyline from node a through the pixels to node b. With a cost grid,
+    each step of that polyline counts its length times the mean cost of the two pixels it joins.
+    component gives each node's connected component, so routes between components are refused
+    without searching.
+    """
+    def __init__(self, skeleton, costs=None):
+        height, width = skeleton.shape
+        self.build(width, height, np.flatnonzero(skeleton), costs)
+    
+    @classmethod
+    def from_pixels(cls, width, height, pixels, costs=None):
+        """Graph of a skeleton given as ascending flat indices y * width + x"""
+        graph = cls.__new__(cls)
+        graph.build(width, height, np.asarray(pixels, dtype=np.int64), costs)
+        return graph
+    
+    def build(self, width, height, pixels, costs):
+        # Pixels are handled by their position in the sorted skeleton, and neighbours are found by
+        # binary search, so memory follows the skeleton rather than the map. Flat indices into the
+        # grid padded by one pixel keep the neighbour offsets from wrapping across rows.
+        stride = width + 2
+        cells = (pixels // width + 1) * stride + pixels % width + 1
+        count = len(cells)
+        offsets = [dy * stride + dx for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+        
+        def positions(of, offset):
+            # Position in cells of each cell of of moved by offset, -1 where that is not skeleton
+            target = of + offset
+            found = np.minimum(np.searchsorted(cells, target), max(count - 1, 0))
+            return np.where(cells[found] == target, found, -1) if count else found
+        
+        # Degree of every pixel, and the two neighbours of each degree-2 pixel (in offsets order)
+        degree = np.zeros(count, dtype=np.uint8)
+        pair = np.full((2, count), -1, dtype=np.int64)
+        for offset in offsets:
+            found = positions(cells, offset)
+            hit = found >= 0
+            slot = hit & (degree < 2)
+            pair[degree[slot], np.flatnonzero(slot)] = found[slot]
+            degree += hit
+        junction_cells = np.flatnonzero(degree != 2).tolist()
+        # Junction pixels are few: their neighbours are kept as lists
+        around = {cell: [] for cell in junction_cells}
+        junction_positions = np.array(junction_cells, dtype=np.int64)
+        for offset in offsets:
+            for cell, found in zip(junction_cells, positions(cells[junction_positions], offset).tolist()):
+                if found >= 0:
+                    around[cell].append(found)
+        first, second = memoryview(pair[0]), memoryview(pair[1])
+        
+        def neighbours(cell):
+            found = around.get(cell)
+            return found if found is not None else (first[cell], second[cell])
+        
+        # Group touching junction pixels (union-find), one node per group
+        group = {cell: cell for cell in junction_cells}
+        
+        def find(cell):
+            while group[cell] != cell:
+                group[cell] = group[group[cell]]
+                cell = group[cell]
+            return cell
+        
+        for cell in junction_cells:
+            for other in around[cell]:
+                if other in group:
+                    group[find(other)] = find(cell)
+        members = {}
+        for cell in junction_cells:
+            members.setdefault(find(cell), []).append(cell)
+        
+        node_cells = []
+        node_id = {}
+        toward_centre = {}  # Next pixel on a path to the node's pixel inside the group
+        for cluster in members.values():
+            y, x = np.divmod(pixels[cluster], width)
+            centre = cluster[int(np.argmin((y - y.mean()) ** 2 + (x - x.mean()) ** 2))]
+            for cell in cluster:
+                node_id[cell] = len(node_cells)
+            node_cells.append(centre)
+            toward_centre[centre] = None
+            queue = [centre]
+            for cell in queue:
+                for other in around[cell]:
+                    if node_id.get(other) == node_id[centre] and other not in toward_centre:
+                        toward_centre[other] = cell
+                        queue.append(other)
+        
+        def to_centre(cell):
+            # Pixels from a junction pixel to (not including) its node's pixel
+            path = []
+            while toward_centre[cell] is not None:
+                path.append(cell)
+                cell = toward_centre[cell]
+            return path
+        
+        traced = bytearray(count)
+        edges = []
+        
+        def trace(a, first_step):
+            # Follow degree-2 pixels from junction pixel a until the next junction pixel; each has
+            # exactly two neighbours, one of them the pixel just left
+            path = to_centre(a)[::-1]
+            previous, current = a, first_step
+            while current not in node_id:
+                traced[current] = 1
+                path.append(current)
+                one, two = first[current], second[current]
+                previous, current = current, (two if one == previous else one)
+            path += to_centre(current)
+            edges.append((node_id[a], node_id[current], path))
+        
+        def trace_from(cell):
+            for other in neighbours(cell):
+                if other not in node_id and not traced[other]:
+                    trace(cell, other)
+        
+        for cell in junction_cells:
+            trace_from(cell)
+        
+        # Closed loops without any junction: promote one pixel of each to a node
+        for cell in np.flatnonzero(degree == 2).tolist():
+            if not traced[cell]:
+                node_id[cell] = len(node_cells)
+                node_cells.append(cell)
+                toward_centre[cell] = None
+                trace_from(cell)
+        
+        def unpad(cells):
+            return pixels[np.asarray(cells, dtype=np.int64)]
+        
+        node_pixels = unpad(node_cells)
+        flat_costs = None if costs is None else np.asarray(costs).reshape(-1)
+        
+        def cost_at(pixels):
+            if flat_costs is None:
+                return np.ones(len(pixels), dtype=np.uint8)
+            return flat_costs[pixels].astype(np.uint8)
+        
+        node_costs = cost_at(node_pixels)
+        measured = []
+        edge_costs = []
+        for a, b, path in edges:
+            path = unpad(path)
+            line = np.concatenate((node_pixels[a:a + 1], path, node_pixels[b:b + 1]))
+            weights = np.concatenate((node_costs[a:a + 1], cost_at(path), node_costs[b:b + 1]))
+            steps = np.hypot(np.diff(line % width), np.diff(line // width)) * (weights[:-1] + weights[1:].astype(float)) / 2
+            measured.append((a, b, float(steps.sum()), path))
+            edge_costs.append(weights[1:-1])
+        self.setup(width, height, node_pixels, measured, unpad(list(node_id)),
+                   np.array(list(node_id.values()), dtype=np.int64), node_costs, edge_costs)
+    
+    def setup(self, width, height, node_pixels, edges, junctions, junction_nodes, node_costs, edge_costs):
+        # Everything else follows from the nodes, the edges and which node each junction pixel joins
+        self.width = width
+        self.height = height
+        self.node_pixels = node_pixels
+        self.nodes = [(int(p % width), int(p // width)) for p in node_pixels]
+        self.edges = edges
+        self.node_costs = node_costs
+        self.edge_costs = edge_costs
+        self.min_cost = int(min(node_costs.min(initial=255), min((c.min(initial=255) for c in edge_costs), default=255)))
+        self.component = connected_labels(len(self.nodes), [edge[0] for edge in edges], [edge[1] for edge in edges])
+        self.adjacency = [[] for _ in self.nodes]
+        for e, (a, b, length, _) in enumerate(self.edges):
+            self.adjacency[a].append((b, length, e))
+            if b != a:
+                self.adjacency[b].append((a, length, e))
+        
+        # Snapping targets: junction pixels map to their node (edge -1, position = node id), the
+        # rest to their edge and index within it
+        self.junctions = junctions
+        self.junction_nodes = junction_nodes
+        pixels = [junctions] + [edge[3] for edge in self.edges]
+        owner = [np.full(len(junctions), -1)] + [np.full(len(edge[3]), e) for e, edge in enumerate(self.edges)]
+        position = [junction_nodes] + [np.arange(len(edge[3])) for edge in self.edges]
+        self.pixels = np.concatenate(pixels).astype(np.int64)
+        self.pixel_edge = np.concatenate(owner).astype(np.int32)
+        self.pixel_position = np.concatenate(position).astype(np.int32)
+        self.index = SpatialIndex(self.pixels % width, self.pixels // width)
+        
+        self.expansions = 0
+    
+    @classmethod
+    def from_mask(cls, mask, costs=None):
+        height, width = mask.shape
+        return cls.from_pixels(width, height, thin_pixels(mask), costs)
+    
+    @classmethod
+    def from_grid(cls, costs):
+        """Graph of the roads (costs > 0) of a cost grid, weighted by it. The grid is only read in
+        bands, so it may be a memory map larger than RAM."""
+        height, width = costs.shape
+        return cls.from_pixels(width, height, thin_pixels(costs), costs)
+    
+    def save(self, path):
+        # Flat arrays in one .npz, edge pixels concatenated in edge order
+        np.savez_compressed(
+            path,
+            shape=np.array([self.height, self.width], dtype=np.int64),
+            node_pixels=self.node_pixels,
+            edge_ends=np.array([(a, b) for a, b, _, _ in self.edges], dtype=np.int32).reshape(-1, 2),
+            edge_length=np.array([edge[2] for edge in self.edges], dtype=np.float64),
+            edge_counts=np.array([len(edge[3]) for edge in self.edges], dtype=np.int64),
+            edge_pixels=np.concatenate([self.node_pixels[:0]] + [edge[3] for edge in self.edges]),
+            junctions=self.junctions,
+            junction_nodes=self.junction_nodes,
+            node_costs=self.node_costs,
+            edge_costs=np.concatenate([self.node_costs[:0]] + self.edge_costs),
+        )
+    
+    @classmethod
+    def load(cls, path):
+        """The graph saved at path, or None if missing or unreadable"""
+        try:
+            with np.load(path) as data:
+                height, width = data["shape"].tolist()
+                splits = np.cumsum(data["edge_counts"])[:-1]
+                pixels = np.split(data["edge_pixels"], splits)
+                edges = [(a, b, length, run) for (a, b), length, run in
+                         zip(data["edge_ends"].tolist(), data["edge_length"].tolist(), pixels)]
+                graph = cls.__new__(cls)
+                graph.setup(width, height, data["node_pixels"], edges, data["junctions"], data["junction_nodes"],
+                            data["node_costs"], np.split(data["edge_costs"], splits))
+                return graph
+        except (OSError, KeyError, ValueError):
+            return None
+    
+    def edge_offsets(self, e):
+        # Distance (weighted like the edge length) along edge e from node a to each interior pixel
+        a, b, length, pixels = self.edges[e]
+        line = np.concatenate((self.node_pixels[a:a + 1], pixels))
+        weights = np.concatenate((self.node_costs[a:a + 1], self.edge_costs[e])).astype(float)
+        steps = np.hypot(np.diff(line % self.width), np.diff(line // self.width)) * (weights[:-1] + weights[1:]) / 2
+        return np.cumsum(steps)
+    
+    def location_component(self, location):
+        edge, position = location
+        return int(self.component[position if edge == -1 else self.edges[edge][0]])
+    
+    def snap(self, point):
+        """Nearest skeleton pixel to point as (edge, position): edge -1 means position is a node id"""
+        i = self.index.nearest(*point)
+        if i is None:
+            return None
+        return int(self.pixel_edge[i]), int(self.pixel_position[i])
+    
+    def anchors(self, location):
+        # Graph nodes reachable from a snapped location, with the distance to each along the skeleton
+        edge, position = location
+        if edge == -1:
+            return {position: 0.0}
+        a, b, length, _ = self.edges[edge]
+        along = float(self.edge_offsets(edge)[position])
+        costs = {a: along}
+        costs[b] = min(costs.get(b, math.inf), length - along)
+        return costs
+    
+    def location_xy(self, location):
+        edge, position = location
+        if edge == -1:
+            return self.nodes[position]
+        pixel = self.edges[edge][3][position]
+        return int(pixel % self.width), int(pixel // self.width)
+    
+    def walk(self, location, node):
+        # Pixels from a snapped location to one end node of its edge (excluded), as flat indices
+        edge, position = location
+        if edge == -1:
+            return self.node_pixels[:0]
+        a, b, length, pixels = self.edges[edge]
+        along = float(self.edge_offsets(edge)[position])
+        use_a = node == a and (node != b or along <= length - along)
+        return pixels[position::-1] if use_a else pixels[position:]
+    
+    def direct_cost(self, source, target):
+        # Distance between two snapped locations on the same edge, without leaving it (None otherwise)
+        if source[0] != target[0] or source[0] == -1:
+            return None
+        offsets = self.edge_offsets(source[0])
+        return abs(float(offsets[source[1]] - offsets[target[1]]))
+    
+    def to_xy(self, pixels):
+        return list(zip((pixels % self.width).tolist(), (pixels // self.width).tolist()))
+    
+    def direct_route(self, source, target):
+        edge, i, j = source[0], source[1], target[1]
+        step = 1 if j >= i else -1
+        return self.to_xy(self.edges[edge][3][i:j + step if j + step >= 0 else None:step])
+    
+    def route_pixels(self, source, target, first, chain):
+        """Expand a route into (x, y) pixels: the source location, node first, then the chain's
+        (previous, edge, next) steps along original edges, then the target location"""
+        parts = [self.walk(source, first), self.node_pixels[first:first + 1]]
+        for previous, e, nxt in chain:
+            pixels = self.edges[e][3]
+            parts.append(pixels if previous == self.edges[e][0] else pixels[::-1])
+            parts.append(self.node_pixels[nxt:nxt + 1])
+        last = chain[-1][2] if chain else first
+        parts.append(self.walk(target, last)[::-1])
+        
+        # Passing through a junction can enter and leave by the same pixels: cut out any such loop
+        pixels = np.concatenate(parts)
+        if len(np.unique(pixels)) == len(pixels):
+            return self.to_xy(pixels)
+        route = []
+        seen = {}
+        for pixel in pixels.tolist():
+            if pixel in seen:
+                for dropped in route[seen[pixel] + 1:]:
+                    del seen[dropped]
+                del route[seen[pixel] + 1:]
+            else:
+                seen[pixel] = len(route)
+                route.append(pixel)
+        return self.to_xy(np.array(route, dtype=np.int64))
+    
+    def find_route(self, start, goal):
+        """Shortest route along the skeleton between the pixels nearest to start and goal, or None"""
+        self.expansions = 0
+        source, target = self.snap(start), self.snap(goal)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [self.location_xy(source)]
+        if self.location_component(source) != self.location_component(target):
+            return None  # Not connected by any road: nothing to search
+        
+        # Both on the same edge: the direct run between them is a candidate too
+        direct = self.direct_cost(source, target)
+        targets = self.anchors(target)
+        gx, gy = self.location_xy(target)
+        
+        min_cost = self.min_cost
+        
+        def heuristic(node):
+            x, y = self.nodes[node]
+            return math.hypot(x - gx, y - gy) * min_cost
+        
+        best_cost = direct if direct is not None else math.inf
+        best_end = None
+        dist = {}
+        parent = {}
+        frontier = []
+        for node, cost in self.anchors(source).items():
+            dist[node] = cost
+            parent[node] = None
+            heapq.heappush(frontier, (cost + heuristic(node), cost, node))
+        
+        while frontier:
+            f, cost, node = heapq.heappop(frontier)
+            if f >= best_cost:
+                break
+            if cost > dist[node]:
+                continue
+            self.expansions += 1
+            if node in targets and cost + targets[node] < best_cost:
+                best_cost, best_end = cost + targets[node], node
+            for neighbor, length, e in self.adjacency[node]:
+                new_cost = cost + length
+                if new_cost < dist.get(neighbor, math.inf):
+                    dist[neighbor] = new_cost
+                    parent[neighbor] = (node, e)
+                    heapq.heappush(frontier, (new_cost + heuristic(neighbor), new_cost, neighbor))
+        
+        if best_end is None and direct is None:
+            return None
+        return self.tree_route(source, target, best_end, parent)
+    
+    def tree_route(self, source, target, end, parent):
+        """Route from source to target through node end, following parent links ((previous node,
+        edge) per node, None at the source's anchors) back to the source; end None means the direct
+        run along their shared edge"""
+        if end is None:
+            return self.direct_route(source, target)
+        chain = []
+        node = end
+        while parent[node] is not None:
+            previous, e = parent[node]
+            chain.append((previous, e, node))
+            node = previous
+        chain.reverse()
+        return self.route_pixels(source, target, node, chain)
+    
+    def find_route_bidirectional(self, start, goal):
+        """Same routes as find_route, searching from both ends at once until the searches meet.
+        
+        Both searches use the average of the two Euclidean estimates, (h_goal - h_start) / 2 going
+        forward and its negation going backward, which keeps each consistent and makes the sum of
+        the two frontier keys a lower bound on any route still to be found.
+        """
+        self.expansions = 0
+        source, target = self.snap(start), self.snap(goal)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [self.location_xy(source)]
+        if self.location_component(source) != self.location_component(target):
+            return None  # Not connected by any road: nothing to search
+        
+        direct = self.direct_cost(source, target)
+        sx, sy = self.location_xy(source)
+        tx, ty = self.location_xy(target)
+        nodes, min_cost = self.nodes, self.min_cost
+        
+        def potential(node):
+            x, y = nodes[node]
+            return (math.hypot(x - tx, y - ty) - math.hypot(x - sx, y - sy)) * min_cost / 2
+        
+        best_cost = direct if direct is not None else math.inf
+        meeting = None
+        dist = ({}, {})
+        parent = ({}, {})
+        frontier = ([], [])
+        for side, location in enumerate((source, target)):
+            sign = 1 - 2 * side
+            for node, cost in self.anchors(location).items():
+                dist[side][node] = cost
+                parent[side][node] = None
+                heapq.heappush(frontier[side], (cost + sign * potential(node), cost, node))
+        
+        while frontier[0] and frontier[1]:
+            if frontier[0][0][0] + frontier[1][0][0] >= best_cost:
+                break
+            # Grow the smaller frontier
+            side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+            sign = 1 - 2 * side
+            _, cost, node = heapq.heappop(frontier[side])
+            if cost > dist[side][node]:
+                continue
+            self.expansions += 1
+            here, there = dist[side], dist[1 - side]
+            if node in there and cost + there[node] < best_cost:
+                best_cost, meeting = cost + there[node], node
+            for neighbor, length, e in self.adjacency[node]:
+                new_cost = cost + length
+                if new_cost < here.get(neighbor, math.inf):
+                    here[neighbor] = new_cost
+                    parent[side][neighbor] = (node, e)
+                    heapq.heappush(frontier[side], (new_cost + sign * potential(neighbor), new_cost, neighbor))
+                    if neighbor in there and new_cost + there[neighbor] < best_cost:
+                        best_cost, meeting = new_cost + there[neighbor], neighbor
+        
+        if meeting is None:
+            return None if direct is None else self.direct_route(source, target)
+        # Forward links up to the meeting node, then the backward search's links on to the target
+        chain = []
+        node = meeting
+        while parent[0][node] is not None:
+            previous, e = parent[0][node]
+            chain.append((previous, e, node))
+            node = previous
+        first = node
+        chain.reverse()
+        node = meeting
+        while parent[1][node] is not None:
+            nxt, e = parent[1][node]
+            chain.append((node, e, nxt))
+            node = nxt
+        return self.route_pixels(source, target, first, chain)
+    
+    def sweep(self, source, targets):
+        """Dijkstra from one snapped location until every target location is reached.
+        
+        Returns a (cost, end) pair per target, end being the node the route arrives through (None
+        for the direct run along a shared edge), with cost inf when unreachable, and the parent
+        links for tree_route.
+        """
+        self.expansions = 0
+        target_anchors = [self.anchors(target) for target in targets]
+        # Targets on other components are never reached; waiting for them would sweep everything
+        component = self.location_component(source)
+        waiting = set().union(*(anchors for target, anchors in zip(targets, target_anchors)
+                                if self.location_component(target) == component))
+        dist = {}
+        parent = {}
+        frontier = []
+        for node, cost in self.anchors(source).items():
+            dist[node] = cost
+            parent[node] = None
+            heapq.heappush(frontier, (cost, node))
+        settled = set()
+        while frontier and waiting:
+            cost, node = heapq.heappop(frontier)
+            if cost > dist[node]:
+                continue
+            self.expansions += 1
+            settled.add(node)
+            waiting.discard(node)
+            for neighbor, length, e in self.adjacency[node]:
+                new_cost = cost + length
+                if new_cost < dist.get(neighbor, math.inf):
+                    dist[neighbor] = new_cost
+                    parent[neighbor] = (node, e)
+                    heapq.heappush(frontier, (new_cost, neighbor))
+        
+        results = []
+        for target, anchors in zip(targets, target_anchors):
+            if target == source:
+                results.append((0.0, None))
+                continue
+            direct = self.direct_cost(source, target)
+            best = (direct if direct is not None else math.inf, None)
+            for node, cost in anchors.items():
+                if node in settled and dist[node] + cost < best[0]:
+                    best = (dist[node] + cost, node)
+            results.append(best)
+        return results, parent
+    
+    def routes_from(self, start, goals):
+        """Shortest routes from start to each of goals from a single Dijkstra sweep; None for goals
+        that cannot be reached"""
+        source = self.snap(start)
+        targets = [self.snap(goal) for goal in goals]
+        if source is None:
+            return [None] * len(goals)
+        reachable = [target for target in targets if target is not None]
+        results, parent = self.sweep(source, reachable)
+        found = dict(zip(reachable, results))
+        routes = []
+        for target in targets:
+            if target is None or found[target][0] == math.inf:
+                routes.append(None)
+            elif target == source:
+                routes.append([self.location_xy(source)])
+            else:
+                routes.append(self.tree_route(source, target, found[target][1], parent))
+        return routes
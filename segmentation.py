@@ -0,0 +1,144 @@
+import numpy as np
+
+# Whole-array NumPy helpers for turning map images into road cost grids: colour classification by
+# table lookup, morphological closing with shifted copies, and connected components by union-find
+# over pixel runs. Grids are indexed [y, x]; costs are uint8 with 0 meaning "not a road".
+
+
+def class_tables(classes):
+    """Lookup tables for classify from road classes (dicts with "hue": (low, high) exclusive bounds
+    on PIL's 0-255 hue, "min_saturation", "min_value" and an integer "cost" of at least 1). Where
+    hue ranges overlap the class listed first wins."""
+    hue_class = np.zeros(256, dtype=np.uint8)
+    for index, road_class in reversed(list(enumerate(classes, 1))):
+        low, high = road_class["hue"]
+        hue_class[low + 1:high] = index
+        if not 1 <= road_class["cost"] <= 255:
+            raise ValueError(f"road class cost must be 1-255, got {road_class['cost']}")
+    # Index 0 (no class) gets thresholds no pixel passes
+    min_saturation = np.array([256] + [c["min_saturation"] for c in classes], dtype=np.int16)
+    min_value = np.array([256] + [c["min_value"] for c in classes], dtype=np.int16)
+    cost = np.array([0] + [c["cost"] for c in classes], dtype=np.uint8)
+    return hue_class, min_saturation, min_value, cost
+
+
+def classify(hsv, tables):
+    """Cost per pixel of an HSV array, every class checked in the same pass of table lookups"""
+    hue_class, min_saturation, min_value, cost = tables
+    index = hue_class[hsv[..., 0]]
+    road = (hsv[..., 1] > min_saturation[index]) & (hsv[..., 2] > min_value[index])
+    return np.where(road, cost[index], 0).astype(np.uint8)
+
+
+def window_filter(grid, radius, reduce):
+    # reduce (np.maximum or np.minimum) over each (2 * radius + 1)-pixel square, one axis at a time;
+    # positions beyond the edges are left out rather than padded
+    for axis in (0, 1):
+        source = grid
+        grid = source.copy()
+        length = source.shape[axis]
+        for shift in range(1, min(radius, length - 1) + 1):
+            ahead = [slice(None)] * 2
+            behind = [slice(None)] * 2
+            ahead[axis], behind[axis] = slice(shift, None), slice(None, -shift)
+            ahead, behind = tuple(ahead), tuple(behind)
+            reduce(grid[ahead], source[behind], out=grid[ahead])
+            reduce(grid[behind], source[ahead], out=grid[behind])
+    return grid
+
+
+def close_gaps(costs, radius):
+    """Morphological closing of the road pixels (dilate, then erode, by a square of side
+    2 * radius + 1). Gap pixels it fills take the highest cost among the roads around them."""
+    if radius < 1:
+        return costs
+    road = costs > 0
+    closed = window_filter(window_filter(road, radius, np.maximum), radius, np.minimum)
+    gaps = closed & ~road
+    if gaps.any():
+        costs = costs.copy()
+        costs[gaps] = window_filter(costs, radius, np.maximum)[gaps]
+    return costs
+
+
+def connected_labels(count, a, b):
+    """Component id (0, 1, ... in order of first appearance) of each of count items linked by
+    pairs (a[i], b[i]): hook-and-compress union-find over whole arrays"""
+    parent = np.arange(count)
+    a, b = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+    while True:
+        pa, pb = parent[a], parent[b]
+        differ = pa != pb
+        if not differ.any():
+            break
+        # Hook the larger root of each linked pair under the smaller, then flatten every chain
+        np.minimum.at(parent, np.maximum(pa, pb)[differ], np.minimum(pa, pb)[differ])
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return np.unique(parent, return_inverse=True)[1].reshape(-1)
+
+
+def row_runs(mask, top=0):
+    # Horizontal runs of True in each row as (row, start, end) arrays, end exclusive, in row order
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    change = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(change == 1)
+    ends = np.nonzero(change == -1)[1]
+    return rows + top, starts, ends
+
+
+class RoadComponents:
+    """8-connected components of a road grid, kept as horizontal pixel runs rather than a label per
+    pixel: memory grows with the road outlines, not the map"""
+    def __init__(self, width, rows, starts, ends, labels=None):
+        self.width = width
+        self.rows, self.starts, self.ends = rows, starts, ends
+        stride = width + 2
+        self.start_keys = rows * stride + starts
+        if labels is None:
+            # Runs on consecutive rows touch when they overlap or meet diagonally; with runs sorted
+            # along each row, the runs of the next row touching run i form one index range
+            end_keys = rows * stride + ends
+            below = (rows + 1) * stride
+            first = np.searchsorted(end_keys, below + starts, side="left")
+            last = np.searchsorted(self.start_keys, below + ends, side="right")
+            counts = np.maximum(last - first, 0)
+            a = np.repeat(np.arange(len(rows)), counts)
+            b = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            labels = connected_labels(len(rows), a, b)
+        self.labels = labels
+        self.count = int(labels.max()) + 1 if len(labels) else 0
+    
+    @classmethod
+    def from_grid(cls, costs, band=512):
+        # Runs are collected band by band, so the grid may be a memory map larger than RAM
+        height, width = costs.shape
+        parts = [row_runs(np.asarray(costs[top:top + band]) > 0, top) for top in range(0, height, band)]
+        rows, starts, ends = (np.concatenate([part[i] for part in parts]) if parts else np.zeros(0, np.int64)
+                              for i in range(3))
+        return cls(width, rows.astype(np.int64), starts.astype(np.int64), ends.astype(np.int64))
+    
+    def label_at(self, x, y):
+        """Component of the road pixel at (x, y), or None off the roads"""
+        i = int(np.searchsorted(self.start_keys, y * (self.width + 2) + x, side="right")) - 1
+        if i >= 0 and self.rows[i] == y and self.starts[i] <= x < self.ends[i]:
+            return int(self.labels[i])
+        return None
+    
+    def save(self, path):
+        np.savez_compressed(path, width=np.array(self.width), rows=self.rows, starts=self.starts,
+                            ends=self.ends, labels=self.labels)
+    
+    @classmethod
+    def load(cls, path):
+        """The components saved at path, or None if missing or unreadable"""
+        try:
+            with np.load(path) as data:
+                return cls(int(data["width"]), data["rows"], data["starts"], data["ends"], data["labels"])
+        except (OSError, KeyError, ValueError):
+            return None
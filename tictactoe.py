@@ -1,6 +1,135 @@
 import tkinter as tk
 from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
 import random
+import threading
+
+# Each cell i of the 3x3 board maps to bit i of an integer mask
+FULL_BOARD = 0b111111111
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # Rows
+    0b001001001, 0b010010010, 0b100100100,  # Columns
+    0b100010001, 0b001010100                # Diagonals
+)
+# Precomputed win test for every possible mask of one player's stones
+IS_WIN = tuple(any(mask & win == win for win in WIN_MASKS) for mask in range(FULL_BOARD + 1))
+
+
+def winning_line(mask):
+    # Return the winning combination contained in mask, or 0 if there is none
+    for win in WIN_MASKS:
+        if mask & win == win:
+            return win
+    return 0
+
+
+def empty_cells(occupied):
+    return [i for i in range(9) if not occupied & (1 << i)]
+
+
+# Interval at which the Tk thread checks whether the background search has finished
+AI_POLL_MS = 20
+
+# Chance of playing the minimax move (otherwise a random empty cell) and the search depth per level
+DIFFICULTY_SETTINGS = {
+    "Easy": {"smart_chance": 0.3, "max_depth": None},
+    "Medium": {"smart_chance": 0.7, "max_depth": 2},
+    "Hard": {"smart_chance": 1.0, "max_depth": None}
+}
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class TicTacToeAI:
+    """Move selection for the O side, independent of the Tk interface"""
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.nodes = 0  # Minimax calls since the counter was last reset
+        self.cancel_event = None  # threading.Event polled by minimax while a cancellable search runs
+    
+    def choose_move(self, ai_mask, player_mask, difficulty, cancel_event=None):
+        settings = DIFFICULTY_SETTINGS[difficulty]
+        
+        if self.rng.random() < settings["smart_chance"]:
+            self.cancel_event = cancel_event
+            try:
+                return self.find_best_move(ai_mask, player_mask, settings["max_depth"])
+            finally:
+                self.cancel_event = None
+        
+        # Random move
+        cells = empty_cells(ai_mask | player_mask)
+        return self.rng.choice(cells) if cells else None
+    
+    def move_distribution(self, ai_mask, player_mask, difficulty):
+        """Return the probability of every move choose_move can make in this position"""
+        settings = DIFFICULTY_SETTINGS[difficulty]
+        cells = empty_cells(ai_mask | player_mask)
+        if not cells:
+            return {}
+        
+        random_share = (1 - settings["smart_chance"]) / len(cells)
+        distribution = {cell: random_share for cell in cells}
+        if settings["smart_chance"] > 0:
+            best_move = self.find_best_move(ai_mask, player_mask, settings["max_depth"])
+            distribution[best_move] += settings["smart_chance"]
+        return distribution
+    
+    def find_best_move(self, ai_mask, player_mask, max_depth=None):
+        occupied = ai_mask | player_mask
+        best_score = float("-inf")
+        best_move = None
+        
+        for i in range(9):
+            bit = 1 << i
+            if not occupied & bit:
+                score = self.minimax(ai_mask | bit, player_mask, 0, False, max_depth)
+                
+                if score > best_score:
+                    best_score = score
+                    best_move = i
+        
+        return best_move
+    
+    def minimax(self, ai_mask, player_mask, depth, is_maximizing, max_depth=None):
+        self.nodes += 1
+        # Checking the event every 1024 nodes keeps the overhead out of the hot path
+        if self.cancel_event is not None and not self.nodes & 1023 and self.cancel_event.is_set():
+            raise SearchCancelled()
+        
+        # Check if max depth is reached (for easier difficulties)
+        if max_depth is not None and depth >= max_depth:
+            return 0
+            
+        # Check terminal states
+        if IS_WIN[ai_mask]:
+            return 10 - depth
+        elif IS_WIN[player_mask]:
+            return depth - 10
+        
+        occupied = ai_mask | player_mask
+        if occupied == FULL_BOARD:
+            return 0
+        
+        if is_maximizing:
+            best_score = float("-inf")
+            for i in range(9):
+                bit = 1 << i
+                if not occupied & bit:
+                    score = self.minimax(ai_mask | bit, player_mask, depth + 1, False, max_depth)
+                    best_score = max(score, best_score)
+            return best_score
+        else:
+            best_score = float("inf")
+            for i in range(9):
+                bit = 1 << i
+                if not occupied & bit:
+                    score = self.minimax(ai_mask, player_mask | bit, depth + 1, True, max_depth)
+                    best_score = min(score, best_score)
+            return best_score
+
 
 class TicTacToe:
     def __init__(self, root):
@@ -12,14 +141,21 @@ class TicTacToe:
         self.player = "X"  # Human player
         self.ai = "O"      # AI player
         self.current_player = self.player  # Player goes first by default
-        self.board = [""] * 9  # Empty 3x3 board
+        self.masks = {self.player: 0, self.ai: 0}  # One bitmask of stones per side
         self.game_over = False
+        self.engine = TicTacToeAI()
+        
+        # The search runs on a single worker thread so the Tk event loop stays responsive
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.ai_after_id = None    # Pending root.after callback (delay or poll) for the AI turn
+        self.search_cancel = None  # threading.Event of the search currently in flight
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.setup_ui()
         
         # If AI goes first, make a move
         if self.current_player == self.ai:
-            self.root.after(500, self.ai_move)
+            self.schedule_ai_move()
     
     def setup_ui(self):
         # Title
@@ -57,7 +193,7 @@ class TicTacToe:
                     font=("Arial", 24, "bold"),
                     width=4,
                     height=2,
-                    command=lambda idx=i*3+j: self.make_move(idx)
+                    command=lambda idx=i*3+j: self.cell_clicked(idx)
                 )
                 button.grid(row=i, column=j, padx=5, pady=5)
                 self.buttons.append(button)
@@ -89,7 +225,7 @@ class TicTacToe:
         
         # Difficulty level (primarily adjusts the randomness of AI in non-winning/blocking moves)
         self.difficulty_var = tk.StringVar(value="Hard")
-        difficulties = ["Easy", "Medium", "Hard"]
+        difficulties = list(DIFFICULTY_SETTINGS)
         difficulty_menu = tk.OptionMenu(
             control_frame,
             self.difficulty_var,
@@ -98,10 +234,11 @@ class TicTacToe:
         difficulty_menu.grid(row=0, column=2, padx=10)
         
     def make_move(self, index):
+        bit = 1 << index
         # Check if the move is valid and the game is not over
-        if self.board[index] == "" and not self.game_over:
+        if not self.occupied() & bit and not self.game_over:
             # Update the board with the player's move
-            self.board[index] = self.current_player
+            self.masks[self.current_player] |= bit
             self.buttons[index].config(
                 text=self.current_player,
                 fg="#3498db" if self.current_player == self.player else "#e74c3c"
@@ -112,7 +249,7 @@ class TicTacToe:
                 self.game_over = True
                 self.status_label.config(text=f"Player {self.current_player} wins!")
                 self.highlight_winning_combination()
-            elif "" not in self.board:
+            elif self.occupied() == FULL_BOARD:
                 self.game_over = True
                 self.status_label.config(text="It's a tie!")
             else:
@@ -122,133 +259,68 @@ class TicTacToe:
                 
                 # If it's AI's turn, make a move
                 if self.current_player == self.ai:
-                    self.root.after(500, self.ai_move)
+                    self.schedule_ai_move()
+    
+    def cell_clicked(self, index):
+        # Ignore clicks while the AI is thinking
+        if self.current_player == self.player:
+            self.make_move(index)
+    
+    def occupied(self):
+        return self.masks[self.player] | self.masks[self.ai]
+    
+    def schedule_ai_move(self):
+        self.ai_after_id = self.root.after(500, self.ai_move)
     
     def ai_move(self):
-        difficulty = self.difficulty_var.get()
-        
-        if difficulty == "Easy":
-            # Mostly random moves, but occasionally makes smart moves
-            if random.random() < 0.3:
-                best_score = float("-inf")
-                best_move = None
-                
-                for i in range(9):
-                    if self.board[i] == "":
-                        self.board[i] = self.ai
-                        score = self.minimax(self.board, 0, False)
-                        self.board[i] = ""
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_move = i
-                
-                self.make_move(best_move)
-            else:
-                # Random move
-                empty_cells = [i for i in range(9) if self.board[i] == ""]
-                if empty_cells:
-                    self.make_move(random.choice(empty_cells))
-                    
-        elif difficulty == "Medium":
-            # Blend of random and minimax
-            if random.random() < 0.7:
-                # Use minimax but with limited depth
-                best_score = float("-inf")
-                best_move = None
-                
-                for i in range(9):
-                    if self.board[i] == "":
-                        self.board[i] = self.ai
-                        score = self.minimax(self.board, 0, False, max_depth=2)
-                        self.board[i] = ""
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_move = i
-                
-                self.make_move(best_move)
-            else:
-                # Random move
-                empty_cells = [i for i in range(9) if self.board[i] == ""]
-                if empty_cells:
-                    self.make_move(random.choice(empty_cells))
-        else:
-            # Hard - Full minimax
-            best_score = float("-inf")
-            best_move = None
-            
-            for i in range(9):
-                if self.board[i] == "":
-                    self.board[i] = self.ai
-                    score = self.minimax(self.board, 0, False)
-                    self.board[i] = ""
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_move = i
-            
-            self.make_move(best_move)
+        # Search on the worker thread against a snapshot of the board
+        self.search_cancel = threading.Event()
+        future = self.executor.submit(
+            self.engine.choose_move,
+            self.masks[self.ai],
+            self.masks[self.player],
+            self.difficulty_var.get(),
+            self.search_cancel
+        )
+        self.ai_after_id = self.root.after(AI_POLL_MS, self.poll_ai_move, future, self.search_cancel)
     
-    def minimax(self, board, depth, is_maximizing, max_depth=None):
-        # Check if max depth is reached (for easier difficulties)
-        if max_depth is not None and depth >= max_depth:
-            return 0
-            
-        # Check terminal states
-        if self.check_winner_board(board, self.ai):
-            return 10 - depth
-        elif self.check_winner_board(board, self.player):
-            return depth - 10
-        elif "" not in board:
-            return 0
+    def poll_ai_move(self, future, cancel_event):
+        if cancel_event.is_set():
+            return  # The game was reset while this search was running
+        if not future.done():
+            self.ai_after_id = self.root.after(AI_POLL_MS, self.poll_ai_move, future, cancel_event)
+            return
         
-        if is_maximizing:
-            best_score = float("-inf")
-            for i in range(9):
-                if board[i] == "":
-                    board[i] = self.ai
-                    score = self.minimax(board, depth + 1, False, max_depth)
-                    board[i] = ""
-                    best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float("inf")
-            for i in range(9):
-                if board[i] == "":
-                    board[i] = self.player
-                    score = self.minimax(board, depth + 1, True, max_depth)
-                    board[i] = ""
-                    best_score = min(score, best_score)
-            return best_score
+        self.ai_after_id = None
+        self.search_cancel = None
+        move = future.result()
+        if move is not None:
+            self.make_move(move)
     
-    def check_winner(self):
-        return self.check_winner_board(self.board, self.current_player)
+    def cancel_ai_move(self):
+        # Drop any pending AI turn so it cannot play into a new game
+        if self.ai_after_id is not None:
+            self.root.after_cancel(self.ai_after_id)
+            self.ai_after_id = None
+        if self.search_cancel is not None:
+            self.search_cancel.set()
+            self.search_cancel = None
     
-    def check_winner_board(self, board, player):
-        # Define winning combinations
-        win_combinations = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Rows
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columns
-            [0, 4, 8], [2, 4, 6]              # Diagonals
-        ]
-        
-        # Check if any winning combination is satisfied
-        for combo in win_combinations:
-            if board[combo[0]] == board[combo[1]] == board[combo[2]] == player:
-                self.winning_combo = combo  # Store the winning combination
-                return True
-        
-        return False
+    def check_winner(self):
+        return IS_WIN[self.masks[self.current_player]]
     
     def highlight_winning_combination(self):
         # Highlight the winning cells
-        for idx in self.winning_combo:
-            self.buttons[idx].config(bg="#27ae60")
+        combo = winning_line(self.masks[self.current_player])
+        for idx in range(9):
+            if combo & (1 << idx):
+                self.buttons[idx].config(bg="#27ae60")
     
     def reset_game(self):
+        self.cancel_ai_move()
+        
         # Reset game state
-        self.board = [""] * 9
+        self.masks = {self.player: 0, self.ai: 0}
         self.game_over = False
         
         # Determine who goes first based on the toggle button
@@ -265,7 +337,7 @@ class TicTacToe:
         
         # If AI goes first, make a move
         if self.current_player == self.ai:
-            self.root.after(500, self.ai_move)
+            self.schedule_ai_move()
     
     def toggle_first_player(self):
         # Toggle between player and AI going first
@@ -276,6 +348,11 @@ class TicTacToe:
         
         # Reset the game with the new first player
         self.reset_game()
+    
+    def on_close(self):
+        self.cancel_ai_move()
+        self.executor.shutdown(wait=False)
+        self.root.destroy()
 
 
 if __name__ == "__main__":
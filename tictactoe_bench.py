@@ -0,0 +1,127 @@
+import argparse
+import sys
+import time
+
+from tictactoe import TicTacToeAI, DIFFICULTY_SETTINGS, FULL_BOARD, IS_WIN, empty_cells
+
+# Headless harness for the tic-tac-toe AI: the opponent (X) tries every legal move at every turn,
+# so each run covers every game the AI can be dragged into, for both choices of first player.
+
+
+class MoveStats:
+    def __init__(self):
+        self.latencies = []  # Seconds per AI decision
+        self.nodes = []      # Minimax calls per AI decision
+    
+    def record(self, seconds, nodes):
+        self.latencies.append(seconds)
+        self.nodes.append(nodes)
+    
+    def percentile(self, values, pct):
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+    
+    def summary(self):
+        if not self.latencies:
+            return "no AI moves"
+        ms = [t * 1000 for t in self.latencies]
+        return (f"{len(ms)} moves | latency ms p50={self.percentile(ms, 50):.3f} "
+                f"p90={self.percentile(ms, 90):.3f} p99={self.percentile(ms, 99):.3f} max={max(ms):.3f} | "
+                f"nodes p50={self.percentile(self.nodes, 50)} max={max(self.nodes)} total={sum(self.nodes)}")
+
+
+def timed(engine, stats, func, *args):
+    engine.nodes = 0
+    start = time.perf_counter()
+    result = func(*args)
+    stats.record(time.perf_counter() - start, engine.nodes)
+    return result
+
+
+def verify_hard(engine, stats):
+    # Walk every opponent move sequence against the deterministic Hard AI
+    results = {"games": 0, "ai_wins": 0, "draws": 0, "losses": []}
+    
+    def play(ai_mask, player_mask, ai_to_move, history):
+        if IS_WIN[ai_mask]:
+            results["games"] += 1
+            results["ai_wins"] += 1
+        elif IS_WIN[player_mask]:
+            results["games"] += 1
+            results["losses"].append(history)
+        elif ai_mask | player_mask == FULL_BOARD:
+            results["games"] += 1
+            results["draws"] += 1
+        elif ai_to_move:
+            move = timed(engine, stats, engine.find_best_move, ai_mask, player_mask)
+            play(ai_mask | (1 << move), player_mask, False, history + [("O", move)])
+        else:
+            for move in empty_cells(ai_mask | player_mask):
+                play(ai_mask, player_mask | (1 << move), True, history + [("X", move)])
+    
+    for ai_first in (False, True):
+        play(0, 0, ai_first, [])
+    return results
+
+
+def outcome_rates(engine, stats, difficulty):
+    # Exact outcome probabilities against an opponent choosing uniformly among all legal moves
+    cache = {}
+    
+    def play(ai_mask, player_mask, ai_to_move):
+        if IS_WIN[ai_mask]:
+            return (1.0, 0.0, 0.0)
+        if IS_WIN[player_mask]:
+            return (0.0, 0.0, 1.0)
+        if ai_mask | player_mask == FULL_BOARD:
+            return (0.0, 1.0, 0.0)
+        
+        key = (ai_mask, player_mask, ai_to_move)
+        if key in cache:
+            return cache[key]
+        
+        if ai_to_move:
+            distribution = timed(engine, stats, engine.move_distribution, ai_mask, player_mask, difficulty)
+            branches = [(prob, play(ai_mask | (1 << move), player_mask, False)) for move, prob in distribution.items()]
+        else:
+            cells = empty_cells(ai_mask | player_mask)
+            branches = [(1 / len(cells), play(ai_mask, player_mask | (1 << move), True)) for move in cells]
+        
+        rates = tuple(sum(prob * outcome[i] for prob, outcome in branches) for i in range(3))
+        cache[key] = rates
+        return rates
+    
+    return {first: play(0, 0, first == "AI") for first in ("Player", "AI")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless correctness check and benchmark for the tic-tac-toe AI")
+    parser.add_argument("--levels", nargs="+", default=list(DIFFICULTY_SETTINGS), choices=list(DIFFICULTY_SETTINGS))
+    args = parser.parse_args()
+    
+    engine = TicTacToeAI()
+    failed = False
+    
+    if "Hard" in args.levels:
+        stats = MoveStats()
+        results = verify_hard(engine, stats)
+        print(f"Hard (exhaustive): {results['games']} games, {results['ai_wins']} AI wins, "
+              f"{results['draws']} draws, {len(results['losses'])} losses")
+        print(f"  {stats.summary()}")
+        for history in results["losses"][:5]:
+            print(f"  LOSS: {' '.join(f'{side}{cell}' for side, cell in history)}")
+        failed = bool(results["losses"])
+    
+    for difficulty in args.levels:
+        stats = MoveStats()
+        for first, (win, draw, loss) in outcome_rates(engine, stats, difficulty).items():
+            print(f"{difficulty} vs uniform opponent, {first} first: "
+                  f"AI win {win:.2%} | draw {draw:.2%} | AI loss {loss:.2%}")
+        print(f"  {stats.summary()}")
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from tictactoe import TicTacToeAI, DIFFICULTY_SETTINGS, FULL_BOARD, IS_WIN
+
+# Batch simulator for tuning the tic-tac-toe difficulty levels. The deterministic part of every
+# TicTacToeAI policy is tabulated once over all 3^9 board encodings (cell value 0 empty, 1 X, 2 O),
+# then whole batches of games are stepped in lock-step with NumPy.
+
+NUM_STATES = 3 ** 9
+POW3 = 3 ** np.arange(9, dtype=np.int32)
+OUTCOMES = ("AI win", "draw", "AI loss")
+OPPONENTS = ("random", "human")
+
+
+class MemoizedAI(TicTacToeAI):
+    # Same scores and tie-breaking as TicTacToeAI, with transpositions shared across searches
+    @lru_cache(maxsize=None)
+    def minimax(self, ai_mask, player_mask, depth, is_maximizing, max_depth=None):
+        return TicTacToeAI.minimax(self, ai_mask, player_mask, depth, is_maximizing, max_depth)
+
+
+def masks_to_state(x_mask, o_mask):
+    return sum(POW3[i] * (1 if x_mask >> i & 1 else 2 if o_mask >> i & 1 else 0) for i in range(9))
+
+
+def completing_move(own_mask, other_mask):
+    # First empty cell that would complete a line for own_mask, or -1
+    occupied = own_mask | other_mask
+    for i in range(9):
+        bit = 1 << i
+        if not occupied & bit and IS_WIN[own_mask | bit]:
+            return i
+    return -1
+
+
+def build_tables():
+    """Tabulate outcome, empty cells and every policy's deterministic move for each reachable board"""
+    engine = MemoizedAI()
+    tables = {
+        "result": np.zeros(NUM_STATES, dtype=np.int8),  # 0 running, 1 X won, 2 O won, 3 draw
+        "empty": np.zeros((NUM_STATES, 9), dtype=bool),
+        "x_win": np.full(NUM_STATES, -1, dtype=np.int8),
+        "x_block": np.full(NUM_STATES, -1, dtype=np.int8),
+    }
+    for depth in {settings["max_depth"] for settings in DIFFICULTY_SETTINGS.values()}:
+        tables[("best", depth)] = np.full(NUM_STATES, -1, dtype=np.int8)
+    
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        x_mask, o_mask = stack.pop()
+        if (x_mask, o_mask) in seen:
+            continue
+        seen.add((x_mask, o_mask))
+        state = masks_to_state(x_mask, o_mask)
+        occupied = x_mask | o_mask
+        tables["empty"][state] = [not occupied >> i & 1 for i in range(9)]
+        
+        if IS_WIN[x_mask]:
+            tables["result"][state] = 1
+            continue
+        if IS_WIN[o_mask]:
+            tables["result"][state] = 2
+            continue
+        if occupied == FULL_BOARD:
+            tables["result"][state] = 3
+            continue
+        
+        x_count, o_count = bin(x_mask).count("1"), bin(o_mask).count("1")
+        if x_count >= o_count:
+            # O may be to move here, whichever side started
+            for depth in {settings["max_depth"] for settings in DIFFICULTY_SETTINGS.values()}:
+                tables[("best", depth)][state] = engine.find_best_move(o_mask, x_mask, depth)
+        if o_count >= x_count:
+            tables["x_win"][state] = completing_move(x_mask, o_mask)
+            tables["x_block"][state] = completing_move(o_mask, x_mask)
+        
+        for i in range(9):
+            bit = 1 << i
+            if not occupied & bit:
+                if x_count >= o_count:
+                    stack.append((x_mask, o_mask | bit))
+                if o_count >= x_count:
+                    stack.append((x_mask | bit, o_mask))
+    return tables
+
+
+def random_moves(rng, tables, states):
+    # Uniform choice among the empty cells of each board
+    keys = rng.random((len(states), 9))
+    keys[~tables["empty"][states]] = -1.0
+    return keys.argmax(axis=1)
+
+
+def simulate(tables, difficulty, opponent, ai_first, games, seed, skill=0.8):
+    """Play a batch of games and return AI win/draw/loss counts"""
+    rng = np.random.default_rng(seed)
+    settings = DIFFICULTY_SETTINGS[difficulty]
+    best = tables[("best", settings["max_depth"])]
+    states = np.zeros(games, dtype=np.int32)
+    results = np.zeros(games, dtype=np.int8)
+    
+    for turn in range(9):
+        running = np.flatnonzero(results == 0)
+        if not len(running):
+            break
+        current = states[running]
+        
+        if (turn % 2 == 0) == ai_first:
+            smart = rng.random(len(running)) < settings["smart_chance"]
+            moves = np.where(smart, best[current], random_moves(rng, tables, current))
+            value = 2
+        else:
+            moves = random_moves(rng, tables, current)
+            if opponent == "human":
+                # Scripted player: with probability skill takes a win, else blocks, else plays randomly
+                attentive = rng.random(len(running)) < skill
+                block = tables["x_block"][current]
+                win = tables["x_win"][current]
+                moves = np.where(attentive & (block >= 0), block, moves)
+                moves = np.where(attentive & (win >= 0), win, moves)
+            value = 1
+        
+        states[running] = current + value * POW3[moves]
+        results[running] = tables["result"][states[running]]
+    
+    return np.array([np.count_nonzero(results == 2), np.count_nonzero(results == 3), np.count_nonzero(results == 1)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate large numbers of tic-tac-toe games per difficulty")
+    parser.add_argument("--games", type=int, default=1_000_000, help="games per difficulty/opponent/first-player cell")
+    parser.add_argument("--batch", type=int, default=250_000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--opponents", nargs="+", default=list(OPPONENTS), choices=OPPONENTS)
+    parser.add_argument("--skill", type=float, default=0.8, help="win/block probability of the human model")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    tables = build_tables()
+    print(f"Policy tables built in {time.perf_counter() - start:.2f}s")
+    
+    cells = [(difficulty, opponent, ai_first)
+             for difficulty in DIFFICULTY_SETTINGS for opponent in args.opponents for ai_first in (False, True)]
+    seeds = np.random.SeedSequence(args.seed).spawn(len(cells))
+    
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        jobs = []
+        for cell, seed in zip(cells, seeds):
+            batches = [min(args.batch, args.games - offset) for offset in range(0, args.games, args.batch)]
+            jobs.append([executor.submit(simulate, tables, *cell, size, child, args.skill)
+                         for size, child in zip(batches, seed.spawn(len(batches)))])
+        
+        for (difficulty, opponent, ai_first), futures in zip(cells, jobs):
+            counts = sum(future.result() for future in futures)
+            rates = " | ".join(f"{name} {count / args.games:.2%}" for name, count in zip(OUTCOMES, counts))
+            print(f"{difficulty:6} vs {opponent:6} ({'AI' if ai_first else 'Player'} first): {rates}")
+    
+    elapsed = time.perf_counter() - start
+    total = args.games * len(cells)
+    print(f"{total} games in {elapsed:.2f}s ({total / elapsed:,.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()